@@ -0,0 +1,259 @@
+"""
+pxl_bench.py - headless benchmarks for the pixel hot path.
+
+Runs the real PixelSource, color tests, and reaction state machines against a non-live frame
+backend (synthetic or a replay recording), so tick latency and grab throughput can be measured on
+any host - no game, no Interception driver, no Windows. Reactions are built from profile.json
+exactly as the core builds them; only the key press is replaced by a fire counter.
+
+Usage:
+    python pxl_bench.py tick [--backend synthetic|replay|mss] [--replay PATH] [--seconds 5] [--producer]
+                           [--reactions N] [--per-pixel]
+    python pxl_bench.py grabs [--backend ...] [--seconds 5]
+    python pxl_bench.py shards [--backend ...] [--seconds 2] [--reactions 128] [--max-shards 8]
+    python pxl_bench.py record PATH --region LEFT TOP WIDTH HEIGHT [--count 200] [--interval 0.025]
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pxl_config import get_settings, load_profile, profile_points
+from pxl_lib import PIXELS, MssBackend, ReplayBackend, SyntheticBackend, record_frames
+from pxl_metrics import METRICS
+from ansi import *
+
+
+def scale_profile( profile, count ):
+    """
+    Return a copy of `profile` with `count` enabled reactions, cloned round-robin from the enabled
+    ones and shifted 4 px right per copy, to measure how tick cost grows with profile size.
+    """
+    if not count:
+        return profile
+    enabled = [ ( n, d ) for n, d in profile[ 'reactions' ].items() if d[ 'enabled' ] ]
+    reactions = {}
+    for i in range( count ):
+        name, data = enabled[ i % len( enabled ) ]
+        clone = dict( data )
+        clone[ 'x' ] = data[ 'x' ] - 4 * i if data[ 'x' ] > 1280 else data[ 'x' ] + 4 * i
+        reactions[ f"{name}_{i}" ] = clone
+    return dict( profile, reactions = reactions )
+
+
+def make_bench_backend( args, profile ):
+    """Backend for a benchmark run; the synthetic screen paints every reaction its safe color."""
+    if args.backend == 'replay':
+        return ReplayBackend( args.replay )
+    if args.backend == 'mss':
+        return MssBackend()
+    backend = SyntheticBackend( grab_cost = ( args.grab_ms / 1000.0, 0.0 ) )
+    for m in profile[ 'wincheck' ][ 'markers' ]:
+        backend.set( m[ 'x' ], m[ 'y' ], m[ 'color' ] )
+    for data in profile[ 'reactions' ].values():
+        if data[ 'type' ] == 'react_if_not_color':
+            backend.set( data[ 'x' ], data[ 'y' ], data[ 'color' ] )
+    return backend
+
+
+def build_bench_pixels( profile, shards = 1, pool = None ):
+    """
+    Monitored pixels for every enabled reaction, wired like PxlReactApp.load_reaction but with a
+    counting callable in place of PI.press. Returns ( pixels, reaction_table, fire_counts ).
+    """
+    from pxlreactHL import Pxl, build_reaction, ReactionTable
+
+    fires = {}
+    pixels = []
+    for name, data in profile[ 'reactions' ].items():
+        if not data[ 'enabled' ]:
+            continue
+        fires[ name ] = 0
+
+        def _react( name = name ):
+            fires[ name ] += 1
+
+        entry = {
+            'sx': data[ 'x' ],
+            'sy': data[ 'y' ],
+            'type': data[ 'type' ],
+            'reaction_color': data[ 'color' ],
+            'tolerance': data[ 'tolerance' ],
+            'cooldown': data[ 'cooldown' ],
+            'ready': data[ 'ready' ],
+            'confirm': data[ 'confirm' ],
+            'ignore_colors': data[ 'ignore_colors' ],
+            'cast_time': data[ 'cast_time' ],
+            'reaction': _react,
+        }
+        pixel = Pxl( len( pixels ) + 1, data[ 'x' ], data[ 'y' ] )
+        pixel.set_reaction( build_reaction( pixel, entry, name, None, None ) )
+        pixels.append( pixel )
+    return pixels, ReactionTable( pixels, shards, pool ), fires
+
+
+def _report( label, samples_s ):
+    ms = sorted( s * 1000.0 for s in samples_s )
+    p99 = ms[ min( len( ms ) - 1, int( len( ms ) * 0.99 ) ) ]
+    print( f"{GREEN}{label}{RESET}: {MAGENTA}{len( ms )}{RESET} samples, "
+           f"mean {MAGENTA}{statistics.fmean( ms ):.3f}{RESET} ms, "
+           f"p50 {MAGENTA}{ms[ len( ms ) // 2 ]:.3f}{RESET} ms, "
+           f"p99 {MAGENTA}{p99:.3f}{RESET} ms, max {MAGENTA}{ms[ -1 ]:.3f}{RESET} ms" )
+
+
+def bench_tick( args ):
+    """Run the poll loop's per-tick work (marker gate + every reaction) back to back."""
+    from pxl_lib import ColorCondition
+
+    settings = get_settings()
+    profile = scale_profile( load_profile(), args.reactions )
+    PIXELS.max_age = settings[ 'app' ][ 'frame_max_age' ]
+    PIXELS.region_mode = args.regions or settings[ 'app' ][ 'frame_regions' ]
+    PIXELS.cluster_distance = settings[ 'app' ][ 'cluster_distance' ]
+    PIXELS.set_backend( make_bench_backend( args, profile ) )
+    PIXELS.register_points( profile_points( profile ) )
+
+    markers = [ ColorCondition( m[ 'x' ], m[ 'y' ], m[ 'color' ], m[ 'tolerance' ] )
+                for m in profile[ 'wincheck' ][ 'markers' ] ]
+    pixels, table, fires = build_bench_pixels( profile )
+    if args.producer:
+        PIXELS.start_producer()
+
+    samples = []
+    deadline = time.perf_counter() + args.seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        if all( m.passes() for m in markers ):
+            if args.per_pixel:
+                for pxl in pixels:
+                    pxl.update_color()
+            else:
+                table.tick()
+        samples.append( time.perf_counter() - started )
+        # Age the frame out so every tick pays for a grab, as the real loop does
+        time.sleep( PIXELS.max_age )
+
+    PIXELS.stop_producer()
+    mode = ( 'producer' if args.producer else 'lazy' ) + ( ', per-pixel' if args.per_pixel else ', table' )
+    _report( f"tick ({args.backend}, {mode}, {len( pixels )} reactions)", samples )
+    fired = { name: count for name, count in fires.items() if count }
+    print( f"fires: {MAGENTA}{sum( fired.values() )}{RESET} total {fired}" )
+    METRICS.report()
+
+
+def bench_shards( args ):
+    """
+    Tick cost of a scaled profile evaluated with 1..max_shards reaction shards. Every reaction's
+    condition is painted as holding and its confirm stretched past the run, so each tick runs every
+    readiness check (the sharded work) without firing: the worst case sharding is meant for.
+    """
+    settings = get_settings()
+    profile = scale_profile( load_profile(), args.reactions )
+    profile = dict( profile, reactions = { name: dict( data, confirm = 3600.0 )
+                                           for name, data in profile[ 'reactions' ].items() } )
+    PIXELS.max_age = settings[ 'app' ][ 'frame_max_age' ]
+    PIXELS.region_mode = args.regions or settings[ 'app' ][ 'frame_regions' ]
+    PIXELS.cluster_distance = settings[ 'app' ][ 'cluster_distance' ]
+    backend = make_bench_backend( args, profile )
+    if isinstance( backend, SyntheticBackend ):
+        for data in profile[ 'reactions' ].values():
+            if data[ 'type' ] == 'react_if_color':
+                backend.set( data[ 'x' ], data[ 'y' ], data[ 'color' ] )
+            else:
+                backend.set( data[ 'x' ], data[ 'y' ], tuple( 255 - c for c in data[ 'color' ] ) )
+    PIXELS.set_backend( backend )
+    PIXELS.register_points( profile_points( profile ) )
+
+    baseline = None
+    for shards in range( 1, args.max_shards + 1 ):
+        pool = ThreadPoolExecutor( max_workers = shards, thread_name_prefix = 'PxlShard' ) if shards > 1 else None
+        pixels, table, _ = build_bench_pixels( profile, shards, pool )
+        samples = []
+        deadline = time.perf_counter() + args.seconds
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            table.tick()
+            samples.append( time.perf_counter() - started )
+            time.sleep( PIXELS.max_age )
+        if pool is not None:
+            pool.shutdown()
+
+        mean = statistics.fmean( samples )
+        baseline = baseline or mean
+        _report( f"shards {shards} ({len( pixels )} reactions, x{baseline / mean:.2f})", samples )
+
+
+def bench_grabs( args ):
+    """Raw backend grab throughput for one tick's worth of the registered profile regions."""
+    settings = get_settings()
+    profile = load_profile()
+    PIXELS.region_mode = args.regions or settings[ 'app' ][ 'frame_regions' ]
+    PIXELS.cluster_distance = settings[ 'app' ][ 'cluster_distance' ]
+    PIXELS.set_backend( make_bench_backend( args, profile ) )
+    PIXELS.register_points( profile_points( profile ) )
+    regions = PIXELS.regions
+    buffers = [ bytearray( r[ 'width' ] * r[ 'height' ] * 4 ) for r in regions ]
+
+    samples = []
+    deadline = time.perf_counter() + args.seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        for region, buf in zip( regions, buffers ):
+            PIXELS.backend.grab_into( region, buf )
+        samples.append( time.perf_counter() - started )
+
+    sizes = ', '.join( f"{r[ 'width' ]}x{r[ 'height' ]}" for r in regions )
+    total = sum( r[ 'width' ] * r[ 'height' ] * 4 for r in regions )
+    print( f"{PIXELS.region_mode}: {MAGENTA}{len( regions )}{RESET} region(s) {CYAN}{sizes}{RESET} "
+           f"({MAGENTA}{total}{RESET} bytes/tick)" )
+    _report( f"grab ({args.backend})", samples )
+
+
+def main():
+    parser = argparse.ArgumentParser( description = 'pxlreact headless hot-path benchmarks' )
+    sub = parser.add_subparsers( dest = 'command', required = True )
+
+    for name in ( 'tick', 'grabs', 'shards' ):
+        p = sub.add_parser( name )
+        p.add_argument( '--backend', choices = ( 'synthetic', 'replay', 'mss' ), default = 'synthetic' )
+        p.add_argument( '--replay', help = 'recording for --backend replay' )
+        p.add_argument( '--seconds', type = float, default = 5.0 )
+        p.add_argument( '--grab-ms', type = float, default = 0.0,
+                        help = 'simulated fixed grab cost for the synthetic backend' )
+        p.add_argument( '--regions', choices = ( 'auto', 'single', 'cluster' ),
+                        help = 'override app.frame_regions' )
+
+    sub.choices[ 'tick' ].add_argument( '--producer', action = 'store_true',
+                                        help = 'grab on a background producer thread' )
+    sub.choices[ 'tick' ].add_argument( '--reactions', type = int, default = 0,
+                                        help = 'clone the enabled reactions up to this many' )
+    sub.choices[ 'tick' ].add_argument( '--per-pixel', action = 'store_true',
+                                        help = 'evaluate with Pxl.update_color instead of the ReactionTable' )
+
+    sub.choices[ 'shards' ].set_defaults( seconds = 2.0 )
+    sub.choices[ 'shards' ].add_argument( '--reactions', type = int, default = 128,
+                                          help = 'clone the enabled reactions up to this many' )
+    sub.choices[ 'shards' ].add_argument( '--max-shards', type = int, default = 8 )
+
+    rec = sub.add_parser( 'record' )
+    rec.add_argument( 'path' )
+    rec.add_argument( '--region', type = int, nargs = 4, required = True,
+                      metavar = ( 'LEFT', 'TOP', 'WIDTH', 'HEIGHT' ) )
+    rec.add_argument( '--count', type = int, default = 200 )
+    rec.add_argument( '--interval', type = float, default = 0.025 )
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        record_frames( args.path, tuple( args.region ), args.count, args.interval )
+        print( f"recorded {MAGENTA}{args.count}{RESET} frames -> {CYAN}{args.path}{RESET}" )
+    elif args.command == 'tick':
+        bench_tick( args )
+    elif args.command == 'shards':
+        bench_shards( args )
+    else:
+        bench_grabs( args )
+
+
+if __name__ == "__main__":
+    main()
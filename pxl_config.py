@@ -5,20 +5,35 @@ pxl_config.py loads, normalizes, and validates the two external configuration fi
 - profile.json: gameplay configuration (reactions, actions, rotations, wincheck), managed by
   the pxl_editor GUI or edited manually
 
-Normalization happens entirely at load time so runtime code never consults global defaults:
+Validation is declarative (pxl_schema) and reports every problem with its JSON path in one pass;
+normalization happens entirely at load time so runtime code never consults global defaults:
 colors become tuples and every color check carries an explicit `tolerance` (falling back to
 color.default_tolerance from settings; wincheck markers default to 0 = exact match).
+
+The normalized profile is cached next to profile.json (`profile.json.cache`, a pickle) keyed by a
+SHA-256 of profile.json, settings.toml, and the loader format: when the key matches, startup and
+reload skip JSON parsing and validation and get exactly the profile the validator accepted last
+time. Bump PROFILE_CACHE_FORMAT whenever normalization changes.
 """
 
+import hashlib
 import json
+import os
+import pickle
 import tomllib
 
 from ansi import *
+from pxl_schema import REACTION_TYPES, validate_profile
 
 SETTINGS_PATH = "settings.toml"
 PROFILE_PATH = "profile.json"
 
-REACTION_TYPES = ( "react_if_color", "react_if_not_color" )
+FRAME_BACKENDS = ( "mss", "replay" )
+FRAME_REGION_MODES = ( "auto", "single", "cluster" )
+
+# Compiled profile cache (see module docstring)
+PROFILE_CACHE_SUFFIX = ".cache"
+PROFILE_CACHE_FORMAT = 2
 
 
 class ConfigError( ValueError ):
@@ -41,6 +56,49 @@ def get_settings( path = SETTINGS_PATH ):
     return _settings
 
 
+# Settings the running app applies on a settings.toml reload (see PxlReactApp._reload_settings);
+# any other changed key is reported and takes effect at the next start
+LIVE_SETTINGS = {
+    "app": ( "tick_interval", "frame_max_age", "adaptive_tick", "fast_tick_interval", "idle_tick_interval",
+             "idle_after", "hot_hold", "wincheck_enter_debounce", "wincheck_exit_debounce" ),
+    "color": ( "default_tolerance", ),
+    "intercept": ( "min_press_delay", "max_press_delay" ),
+    "remapper": ( "min_hold", "max_hold", "cast_queue", "queue_depth", "queue_expiry", "preresolve_max_age" ),
+    "gui": ( "fps", "color_check_hz" ),
+}
+
+
+def reload_settings( path = SETTINGS_PATH ):
+    """
+    Re-read settings.toml into the cached settings. Only the LIVE_SETTINGS keys are updated, in
+    place, so holders of a section (e.g. PxlIntercept's `intercept` table) see the new values;
+    every other key keeps its running value until restart, even for code that re-reads its
+    section lazily. Raises ConfigError, leaving the cache untouched, when the file is invalid.
+    Returns ( settings, restart_keys ): the dotted names of changed keys outside LIVE_SETTINGS.
+    """
+    global _settings
+    fresh = _load_settings( path )
+    if _settings is None:
+        _settings = fresh
+        return _settings, []
+
+    restart = []
+    for section, values in fresh.items():
+        old = _settings.get( section )
+        if not isinstance( values, dict ) or not isinstance( old, dict ):
+            _settings[ section ] = values
+            continue
+        live = LIVE_SETTINGS.get( section, () )
+        for key in set( old ) | set( values ):
+            if old.get( key ) == values.get( key ):
+                continue
+            if key in live:
+                old[ key ] = values[ key ]
+            else:
+                restart.append( f"{section}.{key}" )
+    return _settings, sorted( restart )
+
+
 def _load_settings( path ):
     try:
         with open( path, "rb" ) as fh:
@@ -63,6 +121,57 @@ def _load_settings( path ):
     if not ( 0 < raw[ "app" ][ "frame_max_age" ] <= tick ):
         _fail( f"{path}: app.frame_max_age must be positive and no larger than tick_interval" )
 
+    # Frame backend: "mss" grabs the live screen; "replay" plays a recording (see pxl_bench record)
+    raw[ "app" ].setdefault( "frame_backend", "mss" )
+    raw[ "app" ].setdefault( "replay_path", "" )
+    if raw[ "app" ][ "frame_backend" ] not in FRAME_BACKENDS:
+        _fail( f"{path}: app.frame_backend must be one of {', '.join( FRAME_BACKENDS )}" )
+    if raw[ "app" ][ "frame_backend" ] == "replay" and not raw[ "app" ][ "replay_path" ]:
+        _fail( f"{path}: app.replay_path is required when app.frame_backend = \"replay\"" )
+
+    # Capture regions: "auto" measures grab cost and picks one bounding box or per-cluster boxes
+    raw[ "app" ].setdefault( "frame_regions", "auto" )
+    raw[ "app" ].setdefault( "cluster_distance", 64 )
+    if raw[ "app" ][ "frame_regions" ] not in FRAME_REGION_MODES:
+        _fail( f"{path}: app.frame_regions must be one of {', '.join( FRAME_REGION_MODES )}" )
+    if not ( isinstance( raw[ "app" ][ "cluster_distance" ], int ) and raw[ "app" ][ "cluster_distance" ] >= 0 ):
+        _fail( f"{path}: app.cluster_distance must be a non-negative integer" )
+
+    raw[ "app" ].setdefault( "frame_producer", False )
+
+    # Adaptive pacing: fast while confirm streaks run or the screen just changed, idle when static
+    raw[ "app" ].setdefault( "adaptive_tick", False )
+    raw[ "app" ].setdefault( "fast_tick_interval", 0.005 )
+    raw[ "app" ].setdefault( "idle_tick_interval", 0.100 )
+    raw[ "app" ].setdefault( "idle_after", 2.0 )
+    raw[ "app" ].setdefault( "hot_hold", 0.25 )
+    if not ( 0 < raw[ "app" ][ "fast_tick_interval" ] <= tick <= raw[ "app" ][ "idle_tick_interval" ] < 1 ):
+        _fail( f"{path}: app tick intervals must satisfy 0 < fast_tick_interval <= tick_interval "
+               f"<= idle_tick_interval < 1" )
+    if raw[ "app" ][ "idle_after" ] <= 0 or raw[ "app" ][ "hot_hold" ] < 0:
+        _fail( f"{path}: app.idle_after must be positive and app.hot_hold non-negative" )
+
+    # Reaction sharding: 1 = evaluate every reaction on the poll thread
+    raw[ "app" ].setdefault( "reaction_shards", 1 )
+    if not ( isinstance( raw[ "app" ][ "reaction_shards" ], int ) and 1 <= raw[ "app" ][ "reaction_shards" ] <= 32 ):
+        _fail( f"{path}: app.reaction_shards must be an integer from 1 to 32" )
+
+    # Watch profile.json and settings.toml and apply edits without Ctrl+R (see pxl_watch)
+    raw[ "app" ].setdefault( "watch_files", False )
+    raw[ "app" ].setdefault( "watch_debounce", 0.3 )
+    if raw[ "app" ][ "watch_debounce" ] < 0:
+        _fail( f"{path}: app.watch_debounce must be non-negative" )
+
+    # Compiled profile cache next to profile.json (see module docstring)
+    raw[ "app" ].setdefault( "profile_cache", True )
+
+    # Stateful wincheck: debounced ACTIVE / INACTIVE with transition events (see pxl_wincheck)
+    raw[ "app" ].setdefault( "wincheck_stateful", False )
+    raw[ "app" ].setdefault( "wincheck_enter_debounce", 0.050 )
+    raw[ "app" ].setdefault( "wincheck_exit_debounce", 0.0 )
+    if raw[ "app" ][ "wincheck_enter_debounce" ] < 0 or raw[ "app" ][ "wincheck_exit_debounce" ] < 0:
+        _fail( f"{path}: app.wincheck_enter_debounce / wincheck_exit_debounce must be non-negative" )
+
     tolerance = raw[ "color" ].get( "default_tolerance" )
     if not ( isinstance( tolerance, int ) and tolerance >= 0 ):
         _fail( f"{path}: color.default_tolerance must be a non-negative integer" )
@@ -76,6 +185,18 @@ def _load_settings( path ):
     tlog[ "path" ] = tlog.get( "path" ) or None
     tlog.setdefault( "collapse_tolerance", tolerance )
 
+    remap = raw[ "remapper" ]
+    remap.setdefault( "cast_queue", True )
+    remap.setdefault( "queue_depth", 1 )
+    remap.setdefault( "queue_expiry", 0.75 )
+    remap.setdefault( "preresolve", False )
+    remap.setdefault( "preresolve_max_age", 0.030 )
+    if remap[ "preresolve_max_age" ] <= 0:
+        _fail( f"{path}: remapper.preresolve_max_age must be positive" )
+    depth_ok = isinstance( remap[ "queue_depth" ], int ) and remap[ "queue_depth" ] >= 1
+    if not depth_ok or remap[ "queue_expiry" ] <= 0:
+        _fail( f"{path}: remapper.queue_depth must be a positive integer and queue_expiry positive" )
+
     gui = raw[ "gui" ]
     gui.setdefault( "statusbar_enabled", True )
     gui.setdefault( "fps", 15 )
@@ -89,49 +210,102 @@ def _load_settings( path ):
     return raw
 
 
-def load_profile( path = PROFILE_PATH, default_tolerance = None ):
+def load_profile( path = PROFILE_PATH, default_tolerance = None, cache = None ):
     """
     Load, normalize, and validate profile.json. Returns a dict with keys `wincheck`, `reactions`,
     `actions`, `rotations`. Colors are tuples and every color check carries an explicit
     `tolerance` after this call.
+
+    `cache` (default: settings app.profile_cache) serves the result from, and refreshes, the
+    compiled cache next to `path`; pass False for throwaway files (e.g. the editor's temp save).
     """
     if default_tolerance is None:
         default_tolerance = get_settings()[ "color" ][ "default_tolerance" ]
+    if cache is None:
+        cache = get_settings()[ "app" ][ "profile_cache" ]
 
     try:
-        with open( path, "r", encoding = "utf-8" ) as fh:
-            raw = json.load( fh )
+        with open( path, "rb" ) as fh:
+            data = fh.read()
     except OSError as exc:
         _fail( f"cannot read {path} ({exc})" )
+
+    key = None
+    if cache:
+        key = _profile_cache_key( data, default_tolerance )
+        profile = _read_profile_cache( path + PROFILE_CACHE_SUFFIX, key )
+        if profile is not None:
+            return profile
+
+    profile = _normalize_profile( path, data, default_tolerance )
+    if cache:
+        _write_profile_cache( path + PROFILE_CACHE_SUFFIX, key, profile )
+    return profile
+
+
+def _profile_cache_key( data, default_tolerance ):
+    """SHA-256 over the cache format, the settings file, the tolerance default, and the profile."""
+    digest = hashlib.sha256( f"{PROFILE_CACHE_FORMAT}:{default_tolerance}:".encode() )
+    try:
+        with open( SETTINGS_PATH, "rb" ) as fh:
+            digest.update( fh.read() )
+    except OSError:
+        pass
+    digest.update( b"\0" )
+    digest.update( data )
+    return digest.hexdigest()
+
+
+def _read_profile_cache( cache_path, key ):
+    """The cached profile when `cache_path` holds one for `key`, else None (missing, stale, corrupt)."""
+    try:
+        with open( cache_path, "rb" ) as fh:
+            entry = pickle.load( fh )
+    except Exception:
+        return None
+    if not isinstance( entry, dict ) or entry.get( "key" ) != key:
+        return None
+    return entry.get( "profile" )
+
+
+def _write_profile_cache( cache_path, key, profile ):
+    """Write the cache atomically; failures only cost the next load a rebuild."""
+    tmp = cache_path + ".tmp"
+    try:
+        with open( tmp, "wb" ) as fh:
+            pickle.dump( { "key": key, "profile": profile }, fh, protocol = pickle.HIGHEST_PROTOCOL )
+        os.replace( tmp, cache_path )
+    except OSError:
+        try:
+            os.remove( tmp )
+        except OSError:
+            pass
+
+
+def _normalize_profile( path, data, default_tolerance ):
+    """
+    Parse, validate, and normalize profile bytes read from `path` (see load_profile). The schema
+    check reports every problem at once; normalization below it only fills defaults.
+    """
+    try:
+        raw = json.loads( data )
     except ValueError as exc:
         _fail( f"invalid JSON in {path} ({exc})" )
 
-    for section in ( "wincheck", "reactions", "actions", "rotations" ):
-        if section not in raw:
-            _fail( f"{path}: missing '{section}' section" )
+    errors = validate_profile( raw )
+    if errors:
+        _fail( f"{path}: {len( errors )} problem(s)\n  " + "\n  ".join( errors ) )
 
-    profile = {
+    return {
         "wincheck": _normalize_wincheck( raw[ "wincheck" ] ),
-        "reactions": { name: _normalize_reaction( name, data, default_tolerance )
+        "reactions": { name: _normalize_reaction( data, default_tolerance )
                        for name, data in raw[ "reactions" ].items() },
-        "actions": { name: _normalize_action( name, data, default_tolerance )
+        "actions": { name: _normalize_action( data, default_tolerance )
                      for name, data in raw[ "actions" ].items() },
-        "rotations": { name: _normalize_rotation( name, data )
+        "rotations": { name: _normalize_rotation( data )
                        for name, data in raw[ "rotations" ].items() },
     }
 
-    # Referential integrity: rotations name real actions; source keys are unique across rotations
-    keys_seen = {}
-    for rname, cfg in profile[ "rotations" ].items():
-        if cfg[ "key" ] in keys_seen:
-            _fail( f"rotations '{keys_seen[ cfg[ 'key' ] ]}' and '{rname}' share key '{cfg[ 'key' ]}'" )
-        keys_seen[ cfg[ "key" ] ] = rname
-        for aname in cfg[ "actions" ]:
-            if aname not in profile[ "actions" ]:
-                _fail( f"rotation '{rname}' references unknown action '{aname}'" )
-
-    return profile
-
 
 def profile_points( profile ):
     """
@@ -153,173 +327,73 @@ def profile_points( profile ):
     return points
 
 
-def _color_tuple( value, owner ):
-    """Validate an RGB triple (JSON list) and return it as a tuple."""
-    if not ( isinstance( value, ( list, tuple ) ) and len( value ) == 3
-             and all( isinstance( c, int ) and 0 <= c <= 255 for c in value ) ):
-        _fail( f"invalid color for {owner}: {value}" )
-    return tuple( value )
-
-
-def _check_coords( x, y, owner ):
-    if not ( isinstance( x, int ) and -2560 <= x < 2560 ):
-        _fail( f"invalid x for {owner}: {x}" )
-    if not ( isinstance( y, int ) and 0 <= y < 1440 ):
-        _fail( f"invalid y for {owner}: {y}" )
-
-
-def _check_tolerance( value, owner ):
-    if not ( isinstance( value, int ) and value >= 0 ):
-        _fail( f"invalid tolerance for {owner}: {value}" )
-    return value
-
-
 def _normalize_wincheck( data ):
-    target = data.get( "target_window" )
-    if not ( isinstance( target, str ) and target ):
-        _fail( "wincheck.target_window must be a non-empty string" )
-
-    markers = data.get( "markers" )
-    if not ( isinstance( markers, list ) and markers ):
-        _fail( "wincheck.markers must be a non-empty list" )
-
-    normalized = []
-    for i, m in enumerate( markers ):
-        owner = f"wincheck marker {i}"
-        x, y = m.get( "x" ), m.get( "y" )
-        _check_coords( x, y, owner )
-        normalized.append( {
-            "x": x,
-            "y": y,
-            "color": _color_tuple( m.get( "color" ), owner ),
+    return {
+        "target_window": data[ "target_window" ],
+        "markers": [ {
+            "x": m[ "x" ],
+            "y": m[ "y" ],
+            "color": tuple( m[ "color" ] ),
             # Markers guard against inadvertent reactions, so they default to exact match
-            "tolerance": _check_tolerance( m.get( "tolerance", 0 ), owner ),
-        } )
-
-    return { "target_window": target, "markers": normalized }
+            "tolerance": m.get( "tolerance", 0 ),
+        } for m in data[ "markers" ] ],
+    }
 
 
-def _normalize_ready_spec( spec, owner, default_tolerance ):
-    rtype = spec.get( "type", "cooldown" )
-    if rtype == "color":
-        _check_coords( spec.get( "px", 0 ), spec.get( "py", 0 ), owner )
-        lockout = spec.get( "lockout", 0.5 )
-        if not ( 0 <= lockout < 10 ):
-            _fail( f"unreasonable ready lockout for {owner}: {lockout}" )
+def _normalize_ready_spec( spec, default_tolerance ):
+    if spec.get( "type", "cooldown" ) == "color":
         return {
             "type": "color",
             "px": spec[ "px" ],
             "py": spec[ "py" ],
-            "color": _color_tuple( spec.get( "color" ), owner ),
-            "tolerance": _check_tolerance( spec.get( "tolerance", default_tolerance ), owner ),
-            "lockout": lockout,
+            "color": tuple( spec[ "color" ] ),
+            "tolerance": spec.get( "tolerance", default_tolerance ),
+            "lockout": spec.get( "lockout", 0.5 ),
         }
-    if rtype == "cooldown":
-        cd = spec.get( "cooldown", 0 )
-        if not ( 0 < cd < 180 ):
-            _fail( f"unreasonable ready cooldown for {owner}: {cd}" )
-        return { "type": "cooldown", "cooldown": cd }
-    _fail( f"unknown ready type for {owner}: {rtype}" )
-
-
-def _normalize_reaction( name, data, default_tolerance ):
-    owner = f"reaction '{name}'"
-    _check_coords( data.get( "x", 0 ), data.get( "y", 0 ), owner )
+    return { "type": "cooldown", "cooldown": spec[ "cooldown" ] }
 
-    if data.get( "type" ) not in REACTION_TYPES:
-        _fail( f"invalid type for {owner}: {data.get( 'type' )}" )
-
-    press = data.get( "press" )
-    if not ( isinstance( press, str ) and press ):
-        _fail( f"{owner} must define a non-empty 'press' key" )
-
-    confirm = data.get( "confirm", 0.0 )
-    if not ( 0 <= confirm < 2 ):
-        _fail( f"unreasonable confirm for {owner}: {confirm}" )
-
-    cast_time = data.get( "cast_time", 0.0 )
-    if not ( 0 <= cast_time < 10 ):
-        _fail( f"unreasonable cast_time for {owner}: {cast_time}" )
 
+def _normalize_reaction( data, default_tolerance ):
     ready = data.get( "ready" )
     if ready is not None:
         specs = ready if isinstance( ready, list ) else [ ready ]
-        ready = [ _normalize_ready_spec( s, owner, default_tolerance ) for s in specs ]
-    else:
-        cooldown = data.get( "cooldown", 0 )
-        if not ( 0 < cooldown < 180 ):  # avoid ms/s confusion (never > 3 minutes)
-            _fail( f"unreasonable cooldown for {owner}: {cooldown}" )
-
-    ignore = data.get( "ignore_colors", [] )
-    if not isinstance( ignore, list ):
-        _fail( f"ignore_colors for {owner} must be a list" )
+        ready = [ _normalize_ready_spec( s, default_tolerance ) for s in specs ]
 
     return {
         "enabled": bool( data.get( "enabled", True ) ),
         "x": data[ "x" ],
         "y": data[ "y" ],
         "type": data[ "type" ],
-        "color": _color_tuple( data.get( "color" ), owner ),
-        "tolerance": _check_tolerance( data.get( "tolerance", default_tolerance ), owner ),
-        "confirm": confirm,
+        "color": tuple( data[ "color" ] ),
+        "tolerance": data.get( "tolerance", default_tolerance ),
+        "confirm": data.get( "confirm", 0.0 ),
         "cooldown": data.get( "cooldown" ),
         "ready": ready,
-        "cast_time": cast_time,
-        "ignore_colors": [ _color_tuple( c, owner ) for c in ignore ],
-        "press": press,
+        "cast_time": data.get( "cast_time", 0.0 ),
+        "ignore_colors": [ tuple( c ) for c in data.get( "ignore_colors", [] ) ],
+        "press": data[ "press" ],
     }
 
 
-def _normalize_rotation( name, data ):
+def _normalize_rotation( data ):
     """A rotation binds its own source key to an ordered action sequence (remaps tier retired)."""
-    owner = f"rotation '{name}'"
-    if not isinstance( data, dict ):
-        _fail( f"{owner} must be an object with 'key' and 'actions'" )
-
-    key = data.get( "key" )
-    if not ( isinstance( key, str ) and key ):
-        _fail( f"{owner} must define a non-empty source 'key'" )
-
-    actions = data.get( "actions" )
-    if not ( isinstance( actions, list ) and actions ):
-        _fail( f"{owner} must list at least one action" )
-
-    return { "key": key, "actions": list( actions ) }
-
+    return { "key": data[ "key" ], "actions": list( data[ "actions" ] ) }
 
-def _normalize_action( name, data, default_tolerance ):
-    owner = f"action '{name}'"
-
-    key = data.get( "key" )
-    if not ( isinstance( key, str ) and key ):
-        _fail( f"{owner} must define a non-empty 'key'" )
-
-    cooldown = data.get( "cooldown", 0.0 )
-    if not ( 0 <= cooldown < 180 ):
-        _fail( f"unreasonable cooldown for {owner}: {cooldown}" )
-
-    cast_time = data.get( "cast_time", 0.0 )
-    if not ( 0 <= cast_time < 10 ):
-        _fail( f"unreasonable cast_time for {owner}: {cast_time}" )
 
+def _normalize_action( data, default_tolerance ):
     checks = data.get( "color_check" ) or []
     if isinstance( checks, dict ):
         checks = [ checks ]
-    normalized = []
-    for i, cc in enumerate( checks ):
-        cowner = f"{owner} color_check {i}"
-        _check_coords( cc.get( "px", 0 ), cc.get( "py", 0 ), cowner )
-        normalized.append( {
+
+    return {
+        "key": data[ "key" ],
+        "cooldown": data.get( "cooldown", 0.0 ),
+        "cast_time": data.get( "cast_time", 0.0 ),
+        "color_check": [ {
             "px": cc[ "px" ],
             "py": cc[ "py" ],
-            "color": _color_tuple( cc.get( "color" ), cowner ),
+            "color": tuple( cc[ "color" ] ),
             "match": bool( cc.get( "match", True ) ),
-            "tolerance": _check_tolerance( cc.get( "tolerance", default_tolerance ), cowner ),
-        } )
-
-    return {
-        "key": key,
-        "cooldown": cooldown,
-        "cast_time": cast_time,
-        "color_check": normalized,
+            "tolerance": cc.get( "tolerance", default_tolerance ),
+        } for cc in checks ],
     }
@@ -2,10 +2,11 @@
 pxl_editor.py - standalone DearPyGui editor for profile.json.
 
 Run `python pxl_editor.py` (separate process; the core app is not required to be running). Edits
-are held in memory until Save, which serializes to a temp file, validates it with the same
-pxl_config.load_profile the core uses at startup, and atomically replaces profile.json only on
-success - an invalid profile can never reach disk. Apply changes to a running core with the
-Ctrl+R reload hotkey.
+are held in memory until Save. Every field edit re-validates the entry it belongs to against the
+pxl_schema profile schema (the same one the core's loader uses) and shows the first problem in
+the status line; Save validates the whole profile in memory and atomically replaces profile.json
+only when it is clean - an invalid profile can never reach disk. Apply changes to a running core
+with the Ctrl+R reload hotkey (or app.watch_files).
 
 Tabs: Reactions, Actions, Rotations, Wincheck. Each rotation carries its own source key (the
 former Remaps tier). "Pick" buttons capture the mouse position and pixel color after a short
@@ -19,8 +20,9 @@ import time
 
 import dearpygui.dearpygui as dpg
 
-from pxl_config import ConfigError, load_profile, PROFILE_PATH
+from pxl_config import PROFILE_PATH
 from pxl_lib import get_mouse_pos, get_pixel_color
+from pxl_schema import validate_profile
 
 REACTION_TYPES = ( "react_if_not_color", "react_if_color" )
 PICK_DELAY = 3
@@ -54,11 +56,53 @@ class ProfileEditor:
         """Generic field callback: write app_data into (container, key) from user_data."""
         container, key = user_data
         container[ key ] = app_data
+        self._validate_live( container )
 
     def _cb_set_color( self, sender, app_data, user_data ):
         """Color callback: read via get_value (0-255 floats) and store an int [r, g, b]."""
         container, key = user_data
         container[ key ] = [ int( round( v ) ) for v in dpg.get_value( sender )[ :3 ] ]
+        self._validate_live( container )
+
+    def _export( self ):
+        """
+        The profile as it will be saved: empty ready lists are dropped so the cooldown shorthand
+        validation applies (the form keeps them for editing).
+        """
+        reactions = { name: { k: v for k, v in d.items() if not ( k == 'ready' and not v ) }
+                      for name, d in self.profile[ 'reactions' ].items() }
+        return dict( self.profile, reactions = reactions )
+
+    def _locate( self, container ):
+        """
+        The ( section, name ) subtree holding `container`, or (). `container` may be the entry, one
+        of its nested values (a list such as ignore_colors, or a single-dict color_check), or an
+        item of a nested list.
+        """
+        if container is self.profile[ 'wincheck' ] or any(
+                container is m for m in self.profile[ 'wincheck' ].get( 'markers', [] ) ):
+            return ( 'wincheck', )
+        for section in ( 'reactions', 'actions', 'rotations' ):
+            for name, entry in self.profile[ section ].items():
+                if container is entry:
+                    return ( section, name )
+                for nested in entry.values():
+                    if container is nested or (
+                            isinstance( nested, list ) and any( container is item for item in nested ) ):
+                        return ( section, name )
+        return ()
+
+    def _validate_live( self, container ):
+        """Re-validate just the edited entry (no disk I/O) and surface its first problem."""
+        subtree = self._locate( container )
+        if not subtree:
+            return
+        errors = validate_profile( self._export(), subtree )
+        if errors:
+            more = f" (+{len( errors ) - 1} more)" if len( errors ) > 1 else ""
+            self._status( f"{errors[ 0 ]}{more}", RED_C )
+        else:
+            self._status( f"{'.'.join( subtree )}: ok" )
 
     def _pick( self, sender, app_data, user_data ):
         """
@@ -107,17 +151,20 @@ class ProfileEditor:
     # ============================================================ save / revert
 
     def _save( self ):
-        # Prune empty ready lists so the cooldown shorthand validation applies
-        for data in self.profile[ 'reactions' ].values():
-            if 'ready' in data and not data[ 'ready' ]:
-                del data[ 'ready' ]
+        profile = self._export()
+        errors = validate_profile( profile )
+        if errors:
+            for error in errors:
+                print( error )
+            more = f" (+{len( errors ) - 1} more, see terminal)" if len( errors ) > 1 else ""
+            self._status( f"NOT saved: {errors[ 0 ]}{more}", RED_C )
+            return
 
         tmp = f"{self.path}.tmp"
         try:
             with open( tmp, "w", encoding = "utf-8" ) as fh:
-                json.dump( self.profile, fh, indent = 2 )
-            load_profile( tmp )
-        except ConfigError as exc:
+                json.dump( profile, fh, indent = 2 )
+        except OSError as exc:
             self._status( f"NOT saved: {exc}", RED_C )
             try:
                 os.remove( tmp )
@@ -285,6 +332,7 @@ class ProfileEditor:
     def _cb_set_ignore( self, sender, app_data, user_data ):
         colors, i = user_data
         colors[ i ] = [ int( round( v ) ) for v in dpg.get_value( sender )[ :3 ] ]
+        self._validate_live( colors )
 
     def _build_ignore_rows( self ):
         dpg.delete_item( 'rx_ignore_rows', children_only = True )
@@ -1,15 +1,24 @@
+import functools
+import heapq
+import itertools
 import random
+import threading
 import time
 from itertools import cycle
 
-from concurrent.futures import ThreadPoolExecutor
-
 from ansi import *
 
 from pxl_config import get_settings
+from pxl_metrics import METRICS
 
 # Using local pyinterception files for better control and stability
 import pyinterception.src.interception as pyint
+from pyinterception.src.interception.constants import KeyFlag, MouseFlag, MouseButtonFlag
+from pyinterception.src.interception.strokes import KeyStroke, MouseStroke
+from pyinterception.src.interception._keycodes import get_key_information
+
+# Substitute values that send a mouse click at the current cursor position
+MOUSE_BUTTONS = frozenset( ( 'left', 'right', 'middle' ) )
 
 
 def detect_device_index( my_hwid ):
@@ -31,6 +40,83 @@ def detect_device_index( my_hwid ):
     return None
 
 
+class PackedKeyStroke( KeyStroke ):
+    """
+    KeyStroke whose wire bytes are packed once at construction: Device.send's memmove copies the
+    cached buffer instead of re-packing per send. Treat as immutable (fields are not re-read).
+    """
+
+    def __init__( self, code, flags ):
+        super().__init__( code, flags )
+        self._packed = KeyStroke.data.fget( self )
+
+    @property
+    def data( self ):
+        return self._packed
+
+
+class PackedMouseStroke( MouseStroke ):
+    """MouseStroke with its wire bytes packed once (see PackedKeyStroke)."""
+
+    def __init__( self, flags, button_flags ):
+        super().__init__( flags, button_flags, 0, 0, 0 )
+        self._packed = MouseStroke.data.fget( self )
+
+    @property
+    def data( self ):
+        return self._packed
+
+
+class PressStrokes:
+    """
+    A compiled press of one key or mouse button: the prebuilt stroke sequences for its down and up
+    edges, the device kind they go to ('keyboard' or 'mouse'), and a `key_id` identifying the
+    physical key (so a pending release can be matched to a re-press).
+    """
+
+    __slots__ = ( 'device', 'down', 'up', 'key_id' )
+
+    def __init__( self, device, down, up, key_id ):
+        self.device = device
+        self.down = down
+        self.up = up
+        self.key_id = key_id
+
+
+def _key_edge( info, up ):
+    flags = KeyFlag.KEY_UP if up else KeyFlag.KEY_DOWN
+    if info.is_extended:
+        flags |= KeyFlag.KEY_E0
+    return PackedKeyStroke( info.scan_code, flags )
+
+
+@functools.lru_cache( maxsize = None )
+def compile_press( key ):
+    """
+    Compile `key` (a key name, or a mouse button: left / right / middle) into PressStrokes. Keys
+    needing modifiers reproduce pyinterception's key_down/key_up framing: each edge is wrapped in
+    modifier down ... modifier up strokes. Cached per key name, so every press after the first
+    does no key-name lookup and no stroke allocation.
+    """
+    btn = key.lower()
+    if btn in MOUSE_BUTTONS:
+        down_flag, up_flag = MouseButtonFlag.from_string( btn )
+        return PressStrokes( 'mouse',
+                             ( PackedMouseStroke( MouseFlag.MOUSE_MOVE_ABSOLUTE, down_flag ), ),
+                             ( PackedMouseStroke( MouseFlag.MOUSE_MOVE_ABSOLUTE, up_flag ), ),
+                             ( 'mouse', btn ) )
+
+    info = get_key_information( key )
+    mods = [ get_key_information( m ) for m, on in ( ( 'ctrl', info.ctrl ), ( 'alt', info.alt ),
+                                                     ( 'shift', info.shift ) ) if on ]
+    mods_down = tuple( _key_edge( m, False ) for m in mods )
+    mods_up = tuple( _key_edge( m, True ) for m in mods )
+    return PressStrokes( 'keyboard',
+                         mods_down + ( _key_edge( info, False ), ) + mods_up,
+                         mods_down + ( _key_edge( info, True ), ) + mods_up,
+                         ( 'key', info.scan_code, info.is_extended ) )
+
+
 # Point the library's default send context at our keyboard
 _idx = detect_device_index( get_settings()[ 'devices' ][ 'keyboard_hwid' ] )
 if _idx is not None:
@@ -45,21 +131,34 @@ class PxlIntercept:
 
     PxlIntercept uses asynchronous, non-blocking calls with the intent of supporting common use
     cases like "pressing one key while holding another" which are typical in games. 
+
+    A press is not a task that sleeps through its hold: it becomes two timestamped events (down at
+    now + pre-delay, up a humanized hold later) on a priority queue served by ONE injection thread,
+    which sleeps only until the earliest event. Any number of overlapping presses cost that one
+    thread, and a new press never waits behind another press's hold. Queue depth and how late each
+    event was sent are recorded in pxl_metrics (inject_queue gauge, inject_late_us histogram).
     """
 
     def __init__( self ):
 
-        # Injection thread pool size and humanized delay ranges (ms), from settings.toml
+        # Humanized delay ranges (ms), from settings.toml
         self.pi_cfg = get_settings()[ 'intercept' ]
 
-        mxw = self.pi_cfg[ 'max_workers' ]
-        self.tpexec = ThreadPoolExecutor( max_workers = mxw, thread_name_prefix = 'PxlIntercept' )
-
         self.precompute_size = self.pi_cfg[ 'precompute_size' ]
         self.delays = {}
 
         self._precompute_delays()
 
+        # Timed stroke events: heap of ( due, seq, is_up, ( device_kind, strokes ) ); the condition
+        # guards the heap and wakes the worker when an earlier event arrives
+        self._events = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._late = METRICS.histogram( 'inject_late_us' )
+        self._worker = threading.Thread( target = self._run, name = 'PxlIntercept', daemon = True )
+        self._worker.start()
+
     def _precompute_delays( self ):
         """
         Precompute random hold delays for press.
@@ -75,23 +174,79 @@ class PxlIntercept:
             'press': __make_cycle( mnp, mxp ),
         }
 
+    def apply_settings( self ):
+        """Re-derive the delay cycles after a settings reload updated the `[intercept]` table."""
+        self._precompute_delays()
+
     def _next_delay( self, delay_type ):
         """
         Next value from the requested delay cycle; for now assume single-threaded submission.
         """
         return next( self.delays[ delay_type ] )
 
-    def _press( self, key, pre_delay_s, hold_delay_s ):
-        if pre_delay_s is not None and pre_delay_s > 0:
-            time.sleep( pre_delay_s )
-
-        pyint.key_down( key, delay = hold_delay_s )
-        pyint.key_up( key )
+    def _run( self ):
+        """Injection worker: send each timed event when due; sleep only until the earliest one."""
+        events = self._events
+        while True:
+            with self._cond:
+                while not self._closing:
+                    if events:
+                        delay = events[ 0 ][ 0 ] - time.perf_counter()
+                        if delay <= 0:
+                            break
+                        self._cond.wait( delay )
+                    else:
+                        self._cond.wait()
+                if self._closing:
+                    # Release anything still held; presses not yet down are abandoned
+                    due = [ heapq.heappop( events ) for _ in range( len( events ) ) ]
+                    for event in due:
+                        if event[ 2 ]:
+                            self._send( event[ 3 ] )
+                    return
+                now = time.perf_counter()
+                due = []
+                while events and events[ 0 ][ 0 ] <= now:
+                    due.append( heapq.heappop( events ) )
+                METRICS.gauge( 'inject_queue', len( events ) )
+
+            for event in due:
+                self._send( event[ 3 ] )
+                self._late.record( time.perf_counter() - event[ 0 ] )
+
+    def _send( self, edge ):
+        """
+        Send one edge: ( device_kind, strokes ). Prebuilt strokes go straight to the library's
+        default context (the same path key_down/key_up take, minus their per-call key lookup and
+        stroke packing).
+        """
+        ctx = pyint.inputs._g_context
+        device = ctx.keyboard if edge[ 0 ] == 'keyboard' else ctx.mouse
+        try:
+            for stroke in edge[ 1 ]:
+                ctx.send( device, stroke )
+        except Exception as exc:
+            print( f"{RED}PxlIntercept send failed: {exc}{RESET}" )
+
+    def compile( self, key ):
+        """Precompile `key` (at profile load) so its first press pays no lookup either."""
+        return compile_press( key )
 
     def press( self, key, pre_delay_s = None ):
+        """Press `key`: a key name / mouse button, or PressStrokes already compiled by compile()."""
+        if not isinstance( key, PressStrokes ):
+            key = compile_press( key )
         hold = self._next_delay( 'press' )
-        self.tpexec.submit( self._press, key, pre_delay_s, hold )
+        down_at = time.perf_counter() + ( pre_delay_s or 0.0 )
+        with self._cond:
+            heapq.heappush( self._events, ( down_at, next( self._seq ), False, ( key.device, key.down ) ) )
+            heapq.heappush( self._events, ( down_at + hold, next( self._seq ), True, ( key.device, key.up ) ) )
+            METRICS.gauge( 'inject_queue', len( self._events ) )
+            self._cond.notify()
 
     def close( self ):
         print( f'ℹ️ {YELLOW}Closing PxlIntercept...{RESET}' )
-        self.tpexec.shutdown( wait = True )
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._worker.join( timeout = 1.0 )
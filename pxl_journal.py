@@ -0,0 +1,129 @@
+"""
+pxl_journal.py is the append-only binary event journal behind TriggerLog.
+
+The journal is a 16-byte header followed by fixed 20-byte records, one per reaction firing:
+wall-clock timestamp, reaction id (crc32 of the reaction name), the condition streak in seconds
+(onset to fire, the confirm window included), the triggering RGB, and context flags. The first
+firing of each reaction in a journal is preceded by a name record (the same 20-byte layout with
+the NAME flag, whose `r` byte holds the name length, followed by the UTF-8 name padded to whole
+records), so a journal can be decoded on its own.
+
+Appends never rewrite earlier bytes, so a crash can at worst leave a torn final record; the reader
+stops at the last complete one and Journal truncates the tail before appending again.
+"""
+
+import os
+import struct
+import time
+import zlib
+
+JOURNAL_MAGIC = b'PXLJ'
+JOURNAL_VERSION = 1
+_HEADER = struct.Struct( '<4sId' )     # magic, version, created (wall clock; identifies the journal)
+_RECORD = struct.Struct( '<dIfBBBB' )  # timestamp, reaction id, streak, r, g, b, flags
+
+# Context flags recorded with each firing
+FLAG_CAST_ACTIVE = 0x01     # another cast held the cast lock when the reaction fired
+FLAG_CONFIRMED = 0x02       # the reaction has a confirm window (fired after a held streak)
+FLAG_COLOR_READY = 0x04     # the reaction's readiness includes an indicator pixel
+_FLAG_NAME = 0x80           # name record, not a firing
+
+
+def reaction_id( name ):
+    """Stable 32-bit id of a reaction name (crc32 of its UTF-8 bytes)."""
+    return zlib.crc32( name.encode( 'utf-8' ) )
+
+
+def read_journal( path, start = 0 ):
+    """
+    Decode the journal at `path`, skipping to byte offset `start` (a record boundary previously
+    returned as `end`; 0 reads everything). Returns ( created, events, names, end ):
+    `created` identifies the journal (None when the file is missing or not a journal), `events` is
+    a list of ( timestamp, reaction_id, streak, rgb, flags ), `names` maps the ids named at or after
+    `start` to reaction names, and `end` is the offset just past the last complete record.
+    """
+    try:
+        with open( path, 'rb' ) as fh:
+            data = fh.read()
+    except FileNotFoundError:
+        return None, [], {}, 0
+    if len( data ) < _HEADER.size:
+        return None, [], {}, 0
+    magic, version, created = _HEADER.unpack_from( data, 0 )
+    if magic != JOURNAL_MAGIC or version != JOURNAL_VERSION:
+        return None, [], {}, 0
+
+    events = []
+    names = {}
+    size = _RECORD.size
+    if start > len( data ):
+        # Shorter than the caller's position (cut outside the app): nothing past it to read
+        return created, [], {}, len( data ) - ( len( data ) - _HEADER.size ) % size
+    off = max( start, _HEADER.size )
+    while off + size <= len( data ):
+        ts, rid, streak, r, g, b, flags = _RECORD.unpack_from( data, off )
+        if flags & _FLAG_NAME:
+            span = size * ( 1 + -( -r // size ) )
+            if off + span > len( data ):
+                break
+            names[ rid ] = data[ off + size:off + size + r ].decode( 'utf-8', 'replace' )
+            off += span
+            continue
+        events.append( ( ts, rid, streak, ( r, g, b ), flags ) )
+        off += size
+    return created, events, names, off
+
+
+class Journal:
+    """
+    Append handle for one journal file. Not thread-safe: TriggerLog's writer thread is its only user.
+    """
+
+    def __init__( self, path, created = None, end = 0, named = () ):
+        """
+        Args:
+            path (str): journal file.
+            created (float | None): header timestamp from read_journal; None starts a new journal
+                (replacing an unreadable file).
+            end (int): offset of the last complete record from read_journal; a torn tail is cut.
+            named (iterable): reaction ids already named in this journal.
+        """
+        self.path = path
+        self.named = set( named )
+        if created is None:
+            self.created = time.time()
+            self._fh = open( path, 'wb' )
+            self._fh.write( _HEADER.pack( JOURNAL_MAGIC, JOURNAL_VERSION, self.created ) )
+            self._fh.flush()
+        else:
+            self.created = created
+            self._fh = open( path, 'r+b' )
+            self._fh.truncate( end )
+            self._fh.seek( end )
+        self.offset = self._fh.tell()
+
+    def append( self, events ):
+        """
+        Append a batch of ( timestamp, name, streak, rgb, flags ) firings with one write, naming
+        each reaction the first time it appears. Returns the new end offset.
+        """
+        out = bytearray()
+        for ts, name, streak, ( r, g, b ), flags in events:
+            rid = reaction_id( name )
+            if rid not in self.named:
+                raw = name.encode( 'utf-8' )[ :255 ]
+                out += _RECORD.pack( ts, rid, 0.0, len( raw ), 0, 0, _FLAG_NAME )
+                out += raw.ljust( -( -len( raw ) // _RECORD.size ) * _RECORD.size, b'\0' )
+                self.named.add( rid )
+            out += _RECORD.pack( ts, rid, streak, r, g, b, flags )
+        self._fh.write( out )
+        self._fh.flush()
+        self.offset += len( out )
+        return self.offset
+
+    def sync( self ):
+        """Force appended records to disk (called at compaction, not per batch)."""
+        os.fsync( self._fh.fileno() )
+
+    def close( self ):
+        self._fh.close()
@@ -3,104 +3,640 @@ pxl_lib.py provides various utility functions for use throughout PxlReact; these
 a home in their own class.
 """
 
+import bisect
 import colorsys
 import ctypes
+import functools
+import itertools
+import struct
 import threading
 import time
 from ctypes import wintypes
 
-from mss import MSS
-
 from ansi import *
+from pxl_metrics import METRICS
 
 WPT = wintypes.POINT()
 
 
+class MssBackend:
+    """
+    Live screen grabs through mss: the production frame backend.
+
+    MSS instances are not shareable across threads, so each calling thread gets its own via
+    thread-local storage. mss is imported on first construction rather than at module load, so
+    pxl_lib (and everything built on it) stays importable on hosts that only use the replay or
+    synthetic backends.
+    """
+
+    name = 'mss'
+
+    def __init__( self ):
+        from mss import MSS
+        self._mss_cls = MSS
+        self._tls = threading.local()
+
+    def grab( self, region ):
+        """BGRA bytes for `region` (an mss monitor dict), row-major, width * height * 4 long."""
+        sct = getattr( self._tls, 'sct', None )
+        if sct is None:
+            sct = self._mss_cls()
+            self._tls.sct = sct
+        return sct.grab( region ).raw
+
+    def grab_into( self, region, out ):
+        """
+        Grab `region` into the caller's preallocated buffer. mss hands back a fresh bytearray per
+        grab (it owns the DIB section), so this is one memcpy into `out`; the temporary is
+        released immediately instead of living on as the cached frame.
+        """
+        out[ : ] = self.grab( region )
+
+
+# Replay file layout: a header, then `frame_count` records of ( float64 seconds since the first
+# frame, width * height * 4 BGRA bytes ) covering the recorded screen rectangle.
+_REPLAY_MAGIC = b'PXLF'
+_REPLAY_HEADER = struct.Struct( '<4siiiiI' )    # magic, left, top, width, height, frame_count
+_REPLAY_STAMP = struct.Struct( '<d' )
+
+
+class ReplayBackend:
+    """
+    Plays back BGRA frames recorded with `record_frames`, so the pixel path can be benchmarked and
+    regression-tested off the gaming machine.
+
+    By default each grab advances one frame (deterministic: N ticks see N recorded frames, looping
+    at the end). With `realtime = True` the frame is instead chosen by wall-clock time since the
+    first grab, reproducing the recorded cadence. Grabs may request any region inside the recorded
+    rectangle; a region outside it raises ValueError (reported by PixelSource as a bad grab).
+    """
+
+    name = 'replay'
+
+    def __init__( self, path, realtime = False, loop = True ):
+        with open( path, 'rb' ) as fh:
+            data = fh.read()
+        magic, left, top, width, height, count = _REPLAY_HEADER.unpack_from( data, 0 )
+        if magic != _REPLAY_MAGIC or count == 0:
+            raise ValueError( f'{path} is not a pxlreact frame recording' )
+
+        self.path = path
+        self.left, self.top, self.width, self.height = left, top, width, height
+        self.realtime = realtime
+        self.loop = loop
+
+        size = width * height * 4
+        step = _REPLAY_STAMP.size + size
+        view = memoryview( data )
+        self._stamps = []
+        self._frames = []
+        for i in range( count ):
+            off = _REPLAY_HEADER.size + i * step
+            self._stamps.append( _REPLAY_STAMP.unpack_from( data, off )[ 0 ] )
+            self._frames.append( view[ off + _REPLAY_STAMP.size:off + step ] )
+
+        self._lock = threading.Lock()
+        self._index = 0
+        self._started = None
+
+    def __len__( self ):
+        return len( self._frames )
+
+    def _next_frame( self ):
+        with self._lock:
+            if self.realtime:
+                now = time.perf_counter()
+                if self._started is None:
+                    self._started = now
+                elapsed = now - self._started
+                span = self._stamps[ -1 ]
+                if self.loop and span > 0:
+                    elapsed %= span
+                return self._frames[ max( 0, bisect.bisect_right( self._stamps, elapsed ) - 1 ) ]
+            i = self._index
+            if i >= len( self._frames ):
+                i = 0 if self.loop else len( self._frames ) - 1
+            self._index = i + 1
+            return self._frames[ i ]
+
+    def grab( self, region ):
+        x0 = region[ 'left' ] - self.left
+        y0 = region[ 'top' ] - self.top
+        w, h = region[ 'width' ], region[ 'height' ]
+        if x0 < 0 or y0 < 0 or x0 + w > self.width or y0 + h > self.height:
+            raise ValueError( f'region {region} is outside the recorded frame' )
+
+        frame = self._next_frame()
+        if w == self.width and h == self.height:
+            return frame
+        out = bytearray( w * h * 4 )
+        self._crop_into( frame, x0, y0, w, h, out )
+        return out
+
+    def grab_into( self, region, out ):
+        x0 = region[ 'left' ] - self.left
+        y0 = region[ 'top' ] - self.top
+        w, h = region[ 'width' ], region[ 'height' ]
+        if x0 < 0 or y0 < 0 or x0 + w > self.width or y0 + h > self.height:
+            raise ValueError( f'region {region} is outside the recorded frame' )
+        self._crop_into( self._next_frame(), x0, y0, w, h, out )
+
+    def _crop_into( self, frame, x0, y0, w, h, out ):
+        stride = self.width * 4
+        row = w * 4
+        dst = memoryview( out )
+        for r in range( h ):
+            src = ( y0 + r ) * stride + x0 * 4
+            dst[ r * row:( r + 1 ) * row ] = frame[ src:src + row ]
+
+
+class SyntheticBackend:
+    """
+    Scriptable in-memory screen for headless benchmarks and regression scenarios.
+
+    Every pixel reads as `fill` unless overridden with `set()`. An optional `script( backend,
+    grab_index )` callable runs before each grab and may repaint pixels, so a scenario (an HP bar
+    draining, a marker flickering during a loading screen) plays out over successive ticks.
+    `grab_cost = ( fixed_seconds, seconds_per_pixel )` simulates the capture cost of a real grab
+    (busy-waited, so it shows up as CPU the way a BitBlt does).
+    """
+
+    name = 'synthetic'
+
+    def __init__( self, fill = ( 0, 0, 0 ), script = None, grab_cost = ( 0.0, 0.0 ) ):
+        self.fill = fill
+        self.script = script
+        self.grab_cost = grab_cost
+        self.grabs = 0
+        self._pixels = {}   # ( x, y ) -> ( r, g, b )
+        self._lock = threading.Lock()
+
+    def set( self, x, y, rgb ):
+        with self._lock:
+            self._pixels[ ( x, y ) ] = tuple( rgb )
+
+    def clear( self, x = None, y = None ):
+        """Drop one override (back to `fill`), or every override when called without coordinates."""
+        with self._lock:
+            if x is None:
+                self._pixels.clear()
+            else:
+                self._pixels.pop( ( x, y ), None )
+
+    def grab( self, region ):
+        out = bytearray( region[ 'width' ] * region[ 'height' ] * 4 )
+        self.grab_into( region, out )
+        return out
+
+    def grab_into( self, region, out ):
+        started = time.perf_counter()
+        if self.script is not None:
+            self.script( self, self.grabs )
+        self.grabs += 1
+
+        left, top = region[ 'left' ], region[ 'top' ]
+        w, h = region[ 'width' ], region[ 'height' ]
+        r, g, b = self.fill
+
+        # Paint the fill by doubling an in-buffer span: no temporaries the size of the frame
+        size = w * h * 4
+        view = memoryview( out )
+        view[ 0:4 ] = bytes( ( b, g, r, 255 ) )
+        filled = 4
+        while filled < size:
+            step = min( filled, size - filled )
+            view[ filled:filled + step ] = view[ 0:step ]
+            filled += step
+
+        with self._lock:
+            overrides = list( self._pixels.items() )
+        for ( x, y ), ( pr, pg, pb ) in overrides:
+            if left <= x < left + w and top <= y < top + h:
+                off = ( ( y - top ) * w + ( x - left ) ) * 4
+                out[ off ] = pb
+                out[ off + 1 ] = pg
+                out[ off + 2 ] = pr
+
+        fixed, per_pixel = self.grab_cost
+        deadline = started + fixed + per_pixel * w * h
+        while time.perf_counter() < deadline:
+            pass
+
+
+def record_frames( path, region, count, interval = 0.025, backend = None ):
+    """
+    Record `count` frames of `region` (left, top, width, height) to a replay file for
+    ReplayBackend, one every `interval` seconds. Uses a live MssBackend unless one is supplied.
+    """
+    if backend is None:
+        backend = MssBackend()
+    left, top, width, height = region
+    monitor = { 'left': left, 'top': top, 'width': width, 'height': height }
+    with open( path, 'wb' ) as fh:
+        fh.write( _REPLAY_HEADER.pack( _REPLAY_MAGIC, left, top, width, height, count ) )
+        started = time.perf_counter()
+        for i in range( count ):
+            due = started + i * interval
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep( delay )
+            raw = backend.grab( monitor )
+            fh.write( _REPLAY_STAMP.pack( time.perf_counter() - started ) )
+            fh.write( raw )
+
+
+def make_backend( app_cfg ):
+    """
+    Build the frame backend named by settings `app.frame_backend`: "mss" (live screen) or "replay"
+    (plays `app.replay_path`). The synthetic backend is code-driven and installed with
+    PixelSource.set_backend() by benchmarks rather than selected from settings.
+    """
+    kind = app_cfg[ 'frame_backend' ]
+    if kind == 'replay':
+        return ReplayBackend( app_cfg[ 'replay_path' ], realtime = True )
+    return MssBackend()
+
+
+class _Region:
+    """One cached capture rectangle of a PixelSource, with its own frame and age."""
+
+    __slots__ = ( 'left', 'top', 'width', 'height', 'monitor', 'lock', 'frame', 'buffers', 'back' )
+
+    def __init__( self, left, top, width, height ):
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.monitor = { 'left': left, 'top': top, 'width': width, 'height': height }
+        self.lock = threading.Lock()
+        self.frame = None       # ( memoryview over one of `buffers`, grabbed_at )
+
+        # Double buffer: grabs land in buffers[ back ], which is then published and the roles swap
+        size = width * height * 4
+        self.buffers = ( memoryview( bytearray( size ) ), memoryview( bytearray( size ) ) )
+        self.back = 0
+
+    def contains( self, x, y ):
+        return self.left <= x < self.left + self.width and self.top <= y < self.top + self.height
+
+
+def _bounding_region( points, pad ):
+    xs = [ p[ 0 ] for p in points ]
+    ys = [ p[ 1 ] for p in points ]
+    return _Region( min( xs ) - pad, min( ys ) - pad,
+                    max( xs ) - min( xs ) + 1 + 2 * pad, max( ys ) - min( ys ) + 1 + 2 * pad )
+
+
+def cluster_points( points, distance ):
+    """
+    Group points DBSCAN-style (min_samples = 1): two points share a cluster when a chain of points
+    links them with every hop within `distance` pixels on both axes. Returns a list of point lists;
+    profiles hold tens of points, so the quadratic scan is negligible at register time.
+    """
+    unique = list( dict.fromkeys( points ) )
+    clusters = []
+    seen = set()
+    for seed in unique:
+        if seed in seen:
+            continue
+        seen.add( seed )
+        members = [ seed ]
+        frontier = [ seed ]
+        while frontier:
+            px, py = frontier.pop()
+            for q in unique:
+                if q not in seen and abs( q[ 0 ] - px ) <= distance and abs( q[ 1 ] - py ) <= distance:
+                    seen.add( q )
+                    members.append( q )
+                    frontier.append( q )
+        clusters.append( members )
+    return clusters
+
+
+# Every backend grab (region or 1x1 fallback), on whichever thread performed it
+_GRAB_HIST = METRICS.histogram( 'grab_us' )
+
+
 class PixelSource:
     """
-    Shared screen-pixel reader backed by mss frame grabs.
+    Shared screen-pixel reader backed by frame grabs from a pluggable backend (MssBackend in
+    production; ReplayBackend / SyntheticBackend for headless runs and benchmarks).
 
-    A GDI GetPixel round-trip costs ~2.8 ms on this machine, and an mss BitBlt grab costs the same
-    ~2.8 ms REGARDLESS of region size - so one grab of the bounding region of every configured
-    pixel serves the whole tick (poll loop, readiness checks, remapper fire checks, status bar) for
-    the price of a single legacy read. Indexing pixels out of the grabbed BGRA buffer is
+    A GDI GetPixel round-trip costs ~2.8 ms on this machine, and an mss BitBlt grab has a large
+    fixed cost plus a per-pixel copy cost - so a few grabs of small regions around the configured
+    pixels serve the whole tick (poll loop, readiness checks, remapper fire checks, status bar) for
+    roughly the price of a single legacy read. Indexing pixels out of a grabbed BGRA buffer is
     sub-microsecond (never use mss's ScreenShot.pixel(); it builds a full nested pixel list).
 
-    Thread safety: MSS instances are not shareable across threads, so each calling thread gets its
-    own via thread-local storage; the cached frame (an immutable tuple) is swapped under a lock and
-    read without one. Callers outside the registered region fall back to an uncached 1x1 grab, so
+    Regions: `register_points` either covers every point with one padded bounding box, or clusters
+    nearby points (within `cluster_distance`) into several tight boxes, each with its own cached
+    frame and age. `region_mode` "auto" picks whichever plan the measured grab cost model (fixed
+    cost per grab + cost per pixel, see `calibrate`) predicts is cheaper for a full tick.
+
+    Thread safety: the backend handles per-thread capture state (MSS instances are per-thread);
+    each region's cached frame (an immutable tuple) is swapped under that region's lock and read
+    without one. Callers outside every registered region fall back to an uncached 1x1 grab, so
     discovery tools (pixel picker, Ctrl+P monitor) work with no registration.
 
     `max_age` sets how long a cached frame keeps serving reads: within one poll tick every consumer
     hits the cache, while the next tick (a full tick_interval later) grabs fresh.
+
+    Producer mode (`start_producer`): instead of grabbing lazily on whichever thread first sees a
+    stale frame, a dedicated capture thread grabs every region each `max_age` seconds and publishes
+    the newest frame by reference swap. Readers never grab (and so never stall on capture I/O);
+    they read the latest published frame, falling back to a lazy grab only if the producer has not
+    published within `stale_after` seconds (stopped or wedged).
+
+    Buffers: each region owns two preallocated BGRA buffers. A grab writes into the back buffer
+    (`grab_into`) and publishes a memoryview over it, then the roles swap - no per-grab frame
+    allocation. A published frame stays intact until the grab after next, but grabs from other
+    threads (lazy readers, the producer) can come back to back, so readers treat the publish as a
+    seqlock: after indexing a frame they check it is still the region's current one and re-read
+    if not. `get_many` reads a batch of points against one frame per region, and `frame_view`
+    exposes a region's newest frame as a zero-copy ( height, width, 4 ) memoryview.
     """
 
-    def __init__( self, max_age = 0.010 ):
+    def __init__( self, max_age = 0.010, backend = None, region_mode = 'auto', cluster_distance = 64 ):
         self.max_age = max_age
+        self.region_mode = region_mode
+        self.cluster_distance = cluster_distance
+        self._backend = backend
         self._lock = threading.Lock()
-        self._tls = threading.local()
-        self._region = None     # mss monitor dict covering all registered points
-        self._frame = None      # ( raw_bgra, width, left, top, grabbed_at )
+        self._regions = []          # [ _Region ]
+        self._point_offset = {}     # ( x, y ) -> ( _Region, byte offset ) for every registered point
+        self._points = []
+        self._pad = 2
 
-    def _sct( self ):
-        sct = getattr( self._tls, 'sct', None )
-        if sct is None:
-            sct = MSS()
-            self._tls.sct = sct
-        return sct
+        # Measured grab cost model: ( seconds per grab, seconds per pixel ); None until calibrated
+        self.cost_model = None
+
+        # Frame generation: advances on every published grab (any region), so a result derived
+        # from pixels can be memoized until the next grab (see ColorCondition.passes). Drawn from
+        # an itertools counter so concurrent grabs never share a generation.
+        self.generation = 0
+        self._generations = itertools.count( 1 )
 
-    def register_points( self, points, pad = 2 ):
+        # Producer mode (see start_producer); readers consult only _producing on the hot path
+        self.stale_after = 0.100
+        self._producing = False
+        self._producer = None
+        self._producer_stop = threading.Event()
+
+    @property
+    def backend( self ):
+        # Created on first use so importing pxl_lib never requires mss
+        if self._backend is None:
+            self._backend = MssBackend()
+        return self._backend
+
+    @property
+    def regions( self ):
+        """The active capture rectangles, as mss monitor dicts (for inspection and benchmarks)."""
+        return [ dict( r.monitor ) for r in self._regions ]
+
+    def set_backend( self, backend ):
+        """Swap the frame backend (e.g. a replay or synthetic screen); re-plans regions for it."""
+        with self._lock:
+            self._backend = backend
+            self.cost_model = None
+        self.register_points( self._points, self._pad, force = True )
+
+    def calibrate( self, samples = 3 ):
         """
-        (Re)declare every coordinate the app is configured to read; the cache region becomes their
-        padded bounding box. Called at startup and after a profile reload. An empty list disables
-        the cache (all reads fall back to 1x1 grabs).
+        Measure the backend's grab cost: the median time of a 1x1 grab gives the fixed per-grab
+        cost, and the median of a grab over the registered bounding box gives the per-pixel slope.
+        Returns and stores ( fixed_seconds, seconds_per_pixel ).
         """
-        with self._lock:
-            if not points:
-                self._region = None
+        if not self._points:
+            return self.cost_model
+        box = _bounding_region( self._points, self._pad )
+
+        def _median( monitor ):
+            times = []
+            for _ in range( samples ):
+                started = time.perf_counter()
+                self.backend.grab( monitor )
+                times.append( time.perf_counter() - started )
+            times.sort()
+            return times[ len( times ) // 2 ]
+
+        anchor = self._points[ 0 ]
+        fixed = _median( { 'left': anchor[ 0 ], 'top': anchor[ 1 ], 'width': 1, 'height': 1 } )
+        area = box.width * box.height
+        per_pixel = max( 0.0, _median( box.monitor ) - fixed ) / max( 1, area - 1 )
+        self.cost_model = ( fixed, per_pixel )
+        return self.cost_model
+
+    def _plan_cost( self, regions ):
+        fixed, per_pixel = self.cost_model
+        return sum( fixed + per_pixel * r.width * r.height for r in regions )
+
+    def register_points( self, points, pad = 2, force = False ):
+        """
+        (Re)declare every coordinate the app is configured to read and plan the capture regions
+        for them (see the class docstring). Called at startup and after a profile reload; an
+        unchanged point set keeps the current plan unless `force`. An empty list disables the
+        cache (all reads fall back to 1x1 grabs).
+        """
+        points = list( dict.fromkeys( ( p[ 0 ], p[ 1 ] ) for p in points ) )
+        if not force and self._regions and pad == self._pad and set( points ) == set( self._points ):
+            # Same point set (e.g. a reload that moved nothing): keep the plan and its warm frames
+            return
+        regions = []
+        if points:
+            single = [ _bounding_region( points, pad ) ]
+            clustered = [ _bounding_region( c, pad ) for c in cluster_points( points, self.cluster_distance ) ]
+            if self.region_mode == 'single' or len( clustered ) == 1:
+                regions = single
+            elif self.region_mode == 'cluster':
+                regions = clustered
             else:
-                xs = [ p[ 0 ] for p in points ]
-                ys = [ p[ 1 ] for p in points ]
-                self._region = { 'left': min( xs ) - pad, 'top': min( ys ) - pad,
-                                 'width': max( xs ) - min( xs ) + 1 + 2 * pad,
-                                 'height': max( ys ) - min( ys ) + 1 + 2 * pad }
-            self._frame = None
+                self._points, self._pad = points, pad
+                try:
+                    if self.cost_model is None:
+                        self.calibrate()
+                    regions = clustered if self._plan_cost( clustered ) < self._plan_cost( single ) else single
+                except Exception:
+                    # Uncalibrated (e.g. a failed probe grab): tight regions never copy more bytes
+                    regions = clustered
+
+        point_offset = {}
+        for p in points:
+            region = next( r for r in regions if r.contains( *p ) )
+            point_offset[ p ] = ( region, ( ( p[ 1 ] - region.top ) * region.width + ( p[ 0 ] - region.left ) ) * 4 )
+
+        # Prime new regions before publishing them so producer-mode readers never see an empty
+        # frame (and the producer thread never grabs a half-built plan)
+        if self._producing:
+            for region in regions:
+                with region.lock:
+                    self._grab( region )
+
+        with self._lock:
+            self._points, self._pad = points, pad
+            self._regions = regions
+            self._point_offset = point_offset
+
+    def start_producer( self ):
+        """
+        Switch to producer mode: every region is grabbed once synchronously (so readers have a
+        frame immediately), then a daemon thread keeps them fresh at a fixed `max_age` cadence.
+        """
+        if self._producer is not None and self._producer.is_alive():
+            return
+        for region in self._regions:
+            with region.lock:
+                self._grab( region )
+        self._producer_stop.clear()
+        self._producing = True
+        self._producer = threading.Thread( target = self._produce, name = 'PixelProducer', daemon = True )
+        self._producer.start()
+
+    def stop_producer( self ):
+        """Return to lazy grabbing; safe to call when the producer is not running."""
+        self._producing = False
+        self._producer_stop.set()
+        if self._producer is not None:
+            self._producer.join( timeout = 1.0 )
+            self._producer = None
+
+    def _produce( self ):
+        next_due = time.perf_counter()
+        while not self._producer_stop.is_set():
+            for region in self._regions:
+                # Uncontended unless a reader fell back to a lazy grab of the same region
+                with region.lock:
+                    self._grab( region )
+            # Deadline-based cadence: grab cost does not stretch the period. An overrun rests a full
+            # max_age instead of grabbing again at once: the next grab overwrites the buffer that was
+            # current until this one published, and readers may still be indexing it
+            next_due += self.max_age
+            delay = next_due - time.perf_counter()
+            if delay <= 0:
+                delay = self.max_age
+                next_due = time.perf_counter() + delay
+            self._producer_stop.wait( delay )
+
+    def _grab( self, region ):
+        """
+        Grab `region` into its back buffer and publish it (a single reference swap); None on
+        failure. Callers hold `region.lock`, so only one grab per region writes at a time.
+        """
+        buf = region.buffers[ region.back ]
+        started = time.perf_counter()
+        try:
+            self.backend.grab_into( region.monitor, buf )
+        except Exception:
+            print( f'{MAGENTA}\tbad grab for region ({YELLOW}{region.left}{RESET}, {YELLOW}{region.top}{RESET})' )
+            return None
+        grabbed_at = time.perf_counter()
+        _GRAB_HIST.record( grabbed_at - started )
+        METRICS.count( 'grab_bytes', len( buf ) )
+        frame = ( buf, grabbed_at )
+        region.frame = frame
+        region.back ^= 1
+        self.generation = next( self._generations )
+        return frame
+
+    def _locate( self, x, y ):
+        """( region, byte offset ) for (x, y), or None when no region covers it."""
+        hit = self._point_offset.get( ( x, y ) )
+        if hit is None:
+            region = next( ( r for r in self._regions if r.contains( x, y ) ), None )
+            if region is not None:
+                hit = ( region, ( ( y - region.top ) * region.width + ( x - region.left ) ) * 4 )
+        return hit
 
     def get( self, x, y ):
         """RGB at screen (x, y), or None on a failed grab."""
-        region = self._region
-        if ( region is not None
-             and region[ 'left' ] <= x < region[ 'left' ] + region[ 'width' ]
-             and region[ 'top' ] <= y < region[ 'top' ] + region[ 'height' ] ):
-            return self._get_cached( x, y )
-        return self._get_single( x, y )
-
-    def _get_cached( self, x, y ):
-        frame = self._frame
-        if frame is None or ( time.perf_counter() - frame[ 4 ] ) > self.max_age:
-            with self._lock:
+        hit = self._locate( x, y )
+        if hit is None:
+            return self._get_single( x, y )
+        region, off = hit
+        while True:
+            frame = self._fresh_frame( region )
+            if frame is None:
+                return None
+            raw = frame[ 0 ]
+            rgb = raw[ off + 2 ], raw[ off + 1 ], raw[ off ]     # BGRA -> RGB
+            # Seqlock: the buffer is reused two grabs later, so the read stands only if no grab
+            # published while it ran
+            if region.frame is frame:
+                return rgb
+
+    def get_many( self, points ):
+        """
+        RGBs for every (x, y) in `points`, in order (None entries for failed reads). Each region's
+        freshness is checked once and all of its points are gathered from that single frame, so a
+        batch is internally consistent and costs one staleness check per region, not per point. A
+        region whose frame was replaced while its points were gathered (another thread grabbed,
+        and its buffer may have been rewritten) is gathered again from the new frame.
+        """
+        out = [ None ] * len( points )
+        groups = {}
+        for i, ( x, y ) in enumerate( points ):
+            hit = self._locate( x, y )
+            if hit is None:
+                out[ i ] = self._get_single( x, y )
+                continue
+            region, off = hit
+            group = groups.get( region )
+            if group is None:
+                group = groups[ region ] = []
+            group.append( ( i, off ) )
+
+        for region, group in groups.items():
+            while True:
+                frame = self._fresh_frame( region )
+                if frame is None:
+                    break
+                raw = frame[ 0 ]
+                for i, off in group:
+                    out[ i ] = ( raw[ off + 2 ], raw[ off + 1 ], raw[ off ] )
+                if region.frame is frame:
+                    break
+        return out
+
+    def frame_view( self, x, y ):
+        """
+        Zero-copy view of the newest frame of the region covering (x, y): returns ( view, left,
+        top ) where view is a ( height, width, 4 ) uint8 memoryview and view[ row, col, 0..3 ] are
+        the B, G, R, A bytes of a pixel; None when no region covers the point or the grab failed.
+        The view aliases a reused buffer: it holds this frame only until the grab after next, so
+        copy what is needed at once (get / get_many re-check the frame and retry instead).
+        """
+        hit = self._locate( x, y )
+        if hit is None:
+            return None
+        region = hit[ 0 ]
+        frame = self._fresh_frame( region )
+        if frame is None:
+            return None
+        return frame[ 0 ].cast( 'B', ( region.height, region.width, 4 ) ), region.left, region.top
+
+    def _fresh_frame( self, region ):
+        frame = region.frame
+        max_age = self.stale_after if self._producing else self.max_age
+        if frame is None or ( time.perf_counter() - frame[ 1 ] ) > max_age:
+            with region.lock:
                 # Re-check under the lock; another thread may have refreshed while we waited
-                frame = self._frame
-                if frame is None or ( time.perf_counter() - frame[ 4 ] ) > self.max_age:
-                    try:
-                        shot = self._sct().grab( self._region )
-                    except Exception:
-                        print( f'{MAGENTA}\tbad grab for ({YELLOW}{x}{RESET}, {YELLOW}{y}{RESET})' )
-                        return None
-                    frame = ( shot.raw, shot.width, self._region[ 'left' ],
-                              self._region[ 'top' ], time.perf_counter() )
-                    self._frame = frame
-
-        raw, width, left, top, _ = frame
-        off = ( ( y - top ) * width + ( x - left ) ) * 4
-        return raw[ off + 2 ], raw[ off + 1 ], raw[ off ]     # BGRA -> RGB
+                frame = region.frame
+                if frame is None or ( time.perf_counter() - frame[ 1 ] ) > max_age:
+                    METRICS.count( 'frame_miss' )
+                    return self._grab( region )
+        METRICS.count( 'frame_hit' )
+        return frame
 
     def _get_single( self, x, y ):
+        started = time.perf_counter()
         try:
-            raw = self._sct().grab( { 'left': x, 'top': y, 'width': 1, 'height': 1 } ).raw
+            raw = self.backend.grab( { 'left': x, 'top': y, 'width': 1, 'height': 1 } )
         except Exception:
             print( f'{MAGENTA}\tbad read at {YELLOW}{x}{RESET}, {YELLOW}{y}{RESET}' )
             return None
+        _GRAB_HIST.record( time.perf_counter() - started )
+        METRICS.count( 'grab_bytes', 4 )
+        METRICS.count( 'frame_miss' )
         return raw[ 2 ], raw[ 1 ], raw[ 0 ]
 
 
@@ -161,6 +697,82 @@ class CastLock:
         with self._lock:
             return time.perf_counter() < self._until
 
+    def remaining( self ):
+        """Seconds until the current cast elapses (0.0 when no cast is active)."""
+        with self._lock:
+            return max( 0.0, self._until - time.perf_counter() )
+
+
+class GateOrder:
+    """
+    Cost-aware evaluator for a logical AND of predicates (readiness gates, wincheck tests).
+
+    The result is always the AND of every gate, but the gates are tried in the order that
+    minimizes expected cost: ascending cost / P(fail), where cost is an EWMA of each gate's
+    measured wall time and P(fail) an EWMA of how often it rejects. A cheap gate that often fails
+    (a cooldown) therefore runs first and short-circuits the expensive ones (pixel tests, window
+    title reads). Both statistics are learned online from the calls themselves and the order is
+    recomputed every `reorder_every` calls. Evaluation always short-circuits, so a gate behind a
+    failing one is never run just to sample it (a cooldown-gated readiness never reads its pixel
+    while on cooldown); instead, each reorder ages the fail rate of every gate that was not reached
+    since the last one toward the neutral prior, so a gate stuck behind another is eventually
+    reconsidered.
+
+    Safe to call from several threads: statistics are plain floats (a racing update loses one
+    sample) and the order list is replaced wholesale.
+    """
+
+    # Fail-rate prior, and how far an unreached gate's rate moves toward it per reorder
+    PRIOR = 0.5
+    AGING = 0.1
+
+    def __init__( self, gates, names = None, alpha = 0.05, reorder_every = 64 ):
+        """
+        Args:
+            gates (list[callable]): zero-argument predicates, in config order (the initial order).
+            names (list[str] | None): labels for ordering(); default the callables' names.
+            alpha (float): EWMA weight of each new sample.
+        """
+        self.gates = list( gates )
+        self.names = list( names ) if names is not None else [ getattr( g, '__name__', repr( g ) ) for g in gates ]
+        self.alpha = alpha
+        self.reorder_every = reorder_every
+        self.cost = [ 0.0 ] * len( self.gates )
+        self.fail_rate = [ self.PRIOR ] * len( self.gates )
+        self.order = list( range( len( self.gates ) ) )
+        self._calls = 0
+        # Gates evaluated since the last reorder
+        self._reached = [ False ] * len( self.gates )
+
+    def __call__( self ):
+        self._calls += 1
+        alpha = self.alpha
+        result = True
+        for i in self.order:
+            started = time.perf_counter()
+            ok = self.gates[ i ]()
+            self.cost[ i ] += alpha * ( ( time.perf_counter() - started ) - self.cost[ i ] )
+            self.fail_rate[ i ] += alpha * ( ( 0.0 if ok else 1.0 ) - self.fail_rate[ i ] )
+            self._reached[ i ] = True
+            if not ok:
+                result = False
+                break
+        if self._calls % self.reorder_every == 0:
+            self._reorder()
+        return result
+
+    def _reorder( self ):
+        cost, fail = self.cost, self.fail_rate
+        for i, reached in enumerate( self._reached ):
+            if not reached:
+                fail[ i ] += self.AGING * ( self.PRIOR - fail[ i ] )
+        self._reached = [ False ] * len( self.gates )
+        self.order = sorted( range( len( self.gates ) ), key = lambda i: cost[ i ] / max( fail[ i ], 1e-3 ) )
+
+    def ordering( self ):
+        """Current evaluation order for inspection: [ ( name, cost_us, fail_rate ) ]."""
+        return [ ( self.names[ i ], self.cost[ i ] * 1e6, self.fail_rate[ i ] ) for i in self.order ]
+
 
 def matches_any( color, palette, tolerance ):
     """
@@ -175,6 +787,111 @@ def matches_any( color, palette, tolerance ):
     return any( colors_similar( color, ref, tolerance ) for ref in palette )
 
 
+# ColorClassifier verdicts; 0 marks an unfilled LUT cell and _BOUNDARY a cell that straddles a
+# tolerance boundary and needs the exact SSD test
+MATCH = 1       # within tolerance of the target color
+DIFFERENT = 2   # outside the target tolerance and not on the ignore palette
+IGNORED = 3     # outside the target tolerance but within tolerance of an ignore-palette color
+_BOUNDARY = 4
+
+# Exact-fallback memo cap per classifier (boundary colors seen in play are few)
+_EXACT_MEMO_LIMIT = 65536
+
+
+def _channel_bounds( value ):
+    """
+    Per quantized cell (4 shades wide, 64 cells per channel), the min and max squared distance
+    from `value` to any shade in the cell.
+    """
+    mins, maxs = [], []
+    for cell in range( 64 ):
+        lo, hi = cell * 4, cell * 4 + 3
+        near = 0 if lo <= value <= hi else min( ( lo - value ) ** 2, ( hi - value ) ** 2 )
+        mins.append( near )
+        maxs.append( max( ( lo - value ) ** 2, ( hi - value ) ** 2 ) )
+    return mins, maxs
+
+
+class ColorClassifier:
+    """
+    Precompiled "which side of the tolerance is this color on" test for one target color, its SSD
+    tolerance, and an optional ignore palette: classify() returns MATCH, DIFFERENT, or IGNORED.
+
+    Compiled once per distinct configuration (see `color_classifier`) into a 6-bit-per-channel
+    cube (262144 one-byte cells over the RGB space). Per-channel distance bounds are precomputed
+    at compile time and each cell is classified the first time a color lands in it: a cell whose
+    worst-case SSD is within tolerance is MATCH outright, one whose best case exceeds tolerance is
+    settled against the ignore palette the same way, and only cells straddling a boundary fall
+    back to the exact SSD test (memoized per exact color). After warm-up every verdict, including
+    the ignore-palette test, is one index lookup regardless of palette size.
+    """
+
+    __slots__ = ( 'color', 'tolerance', 'ignore', 'cube', '_bounds', '_ignore_bounds', '_exact' )
+
+    def __init__( self, color, tolerance, ignore = () ):
+        self.color = tuple( color )
+        self.tolerance = tolerance
+        self.ignore = tuple( tuple( c ) for c in ignore )
+        self.cube = bytearray( 64 * 64 * 64 )
+        self._bounds = [ _channel_bounds( c ) for c in self.color ]
+        self._ignore_bounds = [ [ _channel_bounds( c ) for c in ref ] for ref in self.ignore ]
+        self._exact = {}
+
+    def classify( self, rgb ):
+        r, g, b = rgb
+        cell = ( r >> 2 ) << 12 | ( g >> 2 ) << 6 | ( b >> 2 )
+        verdict = self.cube[ cell ]
+        if verdict and verdict != _BOUNDARY:
+            return verdict
+        if not verdict:
+            verdict = self.cube[ cell ] = self._classify_cell( r >> 2, g >> 2, b >> 2 )
+            if verdict != _BOUNDARY:
+                return verdict
+        return self._classify_exact( rgb )
+
+    def _classify_cell( self, cr, cg, cb ):
+        tol = self.tolerance
+        ( rmin, rmax ), ( gmin, gmax ), ( bmin, bmax ) = self._bounds
+        if rmax[ cr ] + gmax[ cg ] + bmax[ cb ] <= tol:
+            return MATCH
+        if rmin[ cr ] + gmin[ cg ] + bmin[ cb ] <= tol:
+            return _BOUNDARY
+        undecided = False
+        for ( irmin, irmax ), ( igmin, igmax ), ( ibmin, ibmax ) in self._ignore_bounds:
+            if irmax[ cr ] + igmax[ cg ] + ibmax[ cb ] <= tol:
+                return IGNORED
+            if irmin[ cr ] + igmin[ cg ] + ibmin[ cb ] <= tol:
+                undecided = True
+        return _BOUNDARY if undecided else DIFFERENT
+
+    def _classify_exact( self, rgb ):
+        key = rgb[ 0 ] << 16 | rgb[ 1 ] << 8 | rgb[ 2 ]
+        verdict = self._exact.get( key )
+        if verdict is None:
+            if colors_similar( rgb, self.color, self.tolerance ):
+                verdict = MATCH
+            elif matches_any( rgb, self.ignore, self.tolerance ):
+                verdict = IGNORED
+            else:
+                verdict = DIFFERENT
+            if len( self._exact ) < _EXACT_MEMO_LIMIT:
+                self._exact[ key ] = verdict
+        return verdict
+
+
+@functools.lru_cache( maxsize = 256 )
+def _cached_classifier( color, tolerance, ignore ):
+    return ColorClassifier( color, tolerance, ignore )
+
+
+def color_classifier( color, tolerance, ignore = () ):
+    """
+    Shared ColorClassifier for a configuration: reactions, readiness checks, markers, and action
+    color checks that test the same color/tolerance/palette reuse one (already warm) cube.
+    """
+    return _cached_classifier( tuple( color ), tolerance, tuple( tuple( c ) for c in ignore ) )
+
+
 class ColorCondition:
     """
     A single pixel-color condition: the pixel at (px, py) must either match `color` (match = True)
@@ -182,9 +899,13 @@ class ColorCondition:
     `passes()` reads the pixel live and applies the test.
 
     Used to compose multi-layered checks where several conditions must all hold (logical AND).
+
+    The verdict is memoized per frame: it is reused until PIXELS publishes its next grab (or the
+    memo outlives the frame cache lifetime), so rotations sharing an Action, the wincheck markers
+    read by both the poll loop and the remapper, and the status bar test each pixel once per frame.
     """
 
-    __slots__ = ( 'px', 'py', 'color', 'match', 'tolerance' )
+    __slots__ = ( 'px', 'py', 'color', 'match', 'tolerance', 'classifier', '_memo' )
 
     def __init__( self, px, py, color, tolerance, match = True ):
         self.px = px
@@ -192,18 +913,36 @@ class ColorCondition:
         self.color = color
         self.tolerance = tolerance
         self.match = match
+        self.classifier = color_classifier( color, tolerance )
+
+        # ( frame generation, perf_counter stamp, verdict ) of the last evaluation
+        self._memo = None
+
+    def cached( self ):
+        """The verdict memoized for the current frame, or None when a fresh test is needed."""
+        memo = self._memo
+        if memo is None or memo[ 0 ] != PIXELS.generation:
+            return None
+        if ( time.perf_counter() - memo[ 1 ] ) > PIXELS.max_age:
+            return None
+        return memo[ 2 ]
 
     def passes( self ):
         """
         Read the configured pixel and return whether the condition holds. A failed read (None)
         fails the condition, since we cannot confirm the required state.
         """
+        verdict = self.cached()
+        if verdict is not None:
+            return verdict
+        # Generation before the read: a grab racing the read leaves the memo tagged with an older
+        # generation (re-tested next call) rather than passing an old frame's verdict off as current
+        generation = PIXELS.generation
+        stamp = time.perf_counter()
         observed = get_pixel_color( self.px, self.py )
-        if observed is None:
-            return False
-        if self.match:
-            return colors_similar( observed, self.color, self.tolerance )
-        return colors_different( observed, self.color, self.tolerance )
+        verdict = observed is not None and ( self.classifier.classify( observed ) == MATCH ) == self.match
+        self._memo = ( generation, stamp, verdict )
+        return verdict
 
 
 def get_mouse_pos():
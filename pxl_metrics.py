@@ -0,0 +1,185 @@
+"""
+pxl_metrics.py provides low-overhead runtime instrumentation: fixed-bucket log-linear latency
+histograms, per-thread counters, and gauges, collected into the module-level METRICS registry.
+
+Recording is a bucket-index computation plus one list increment - no allocation, no lock, no
+sorting - so it is cheap enough for the grab and tick hot paths. Buckets are HDR-style: values
+are integer microseconds, each power of two is split into SUB_BUCKETS linear sub-buckets, so any
+recorded value is reported within 1/SUB_BUCKETS (12.5%) of its true magnitude from 1 us to minutes
+in a fixed 200-slot array. Increments are not locked: a histogram shared by several threads (grab
+timings) may very rarely lose a count to a racing increment, which does not move a percentile.
+
+Instruments (names used by the core):
+- grab_us          PixelSource backend grab duration (any thread)
+- tick_us          poll loop work per tick (wake to sleep)
+- jitter_us        poll loop wake-up lateness past the tick deadline
+- onset_fire_us    reaction condition onset to key submitted (includes the confirm window)
+- inject_late_us   PxlIntercept injection worker: stroke sent past its scheduled time
+- counters         grab bytes, frame cache hits/misses per thread, tick overruns
+- gauges           inject_queue (pending timed strokes): last and peak value
+
+The poll loop publishes METRICS.summary() to the StatusHub about once a second; PxlReactApp
+prints METRICS.report() at exit next to the trigger log report.
+"""
+
+import threading
+
+from ansi import *
+
+# Linear sub-buckets per power of two (relative bucket width 1/SUB_BUCKETS)
+SUB_BUCKETS = 8
+_SUB_BITS = 3
+BUCKETS = 200
+
+
+def _bucket( us ):
+    """Bucket index for a non-negative integer microsecond value."""
+    if us < SUB_BUCKETS:
+        return us
+    shift = us.bit_length() - _SUB_BITS - 1
+    index = ( shift + 1 ) * SUB_BUCKETS + ( us >> shift ) - SUB_BUCKETS
+    return index if index < BUCKETS else BUCKETS - 1
+
+
+def _bucket_floor( index ):
+    """Smallest microsecond value that lands in bucket `index`."""
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return ( SUB_BUCKETS + index % SUB_BUCKETS ) << shift
+
+
+class Histogram:
+    """Fixed-bucket latency histogram over integer microseconds."""
+
+    __slots__ = ( 'name', 'counts', 'total', 'sum_us', 'max_us' )
+
+    def __init__( self, name ):
+        self.name = name
+        self.counts = [ 0 ] * BUCKETS
+        self.total = 0
+        self.sum_us = 0
+        self.max_us = 0
+
+    def record( self, seconds ):
+        """Record one duration given in seconds (negative values clamp to 0)."""
+        us = int( seconds * 1_000_000 ) if seconds > 0 else 0
+        self.counts[ _bucket( us ) ] += 1
+        self.total += 1
+        self.sum_us += us
+        if us > self.max_us:
+            self.max_us = us
+
+    def percentile( self, q ):
+        """Approximate `q`-th percentile (0..100) in microseconds; 0 when empty."""
+        if not self.total:
+            return 0
+        rank = max( 1, int( self.total * q / 100.0 + 0.5 ) )
+        seen = 0
+        for index, count in enumerate( self.counts ):
+            seen += count
+            if seen >= rank:
+                return min( _bucket_floor( index ), self.max_us )
+        return self.max_us
+
+    def summary( self ):
+        """{ count, mean, p50, p99, max } with latencies in milliseconds."""
+        return {
+            'count': self.total,
+            'mean': self.sum_us / self.total / 1000.0 if self.total else 0.0,
+            'p50': self.percentile( 50 ) / 1000.0,
+            'p99': self.percentile( 99 ) / 1000.0,
+            'max': self.max_us / 1000.0,
+        }
+
+    def reset( self ):
+        self.counts = [ 0 ] * BUCKETS
+        self.total = 0
+        self.sum_us = 0
+        self.max_us = 0
+
+
+class Metrics:
+    """
+    Registry of named histograms, counters, and gauges. Instruments are created on first use; callers on a
+    hot path keep a reference to the Histogram rather than looking it up per record.
+    """
+
+    def __init__( self ):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        # name -> { thread_name: count }
+        self.counters = {}
+        # name -> [ last, peak ]
+        self.gauges = {}
+
+    def histogram( self, name ):
+        hist = self.histograms.get( name )
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault( name, Histogram( name ) )
+        return hist
+
+    def count( self, name, amount = 1 ):
+        """Add `amount` to counter `name`, attributed to the calling thread."""
+        per_thread = self.counters.get( name )
+        if per_thread is None:
+            with self._lock:
+                per_thread = self.counters.setdefault( name, {} )
+        thread = threading.current_thread().name
+        per_thread[ thread ] = per_thread.get( thread, 0 ) + amount
+
+    def gauge( self, name, value ):
+        """Set gauge `name` to `value`, tracking its peak."""
+        g = self.gauges.get( name )
+        if g is None:
+            with self._lock:
+                g = self.gauges.setdefault( name, [ value, value ] )
+        g[ 0 ] = value
+        if value > g[ 1 ]:
+            g[ 1 ] = value
+
+    def summary( self ):
+        """
+        Plain-dict snapshot: { 'histograms': { name: summary }, 'counters': { name: { thread: n } },
+        'gauges': { name: { 'last', 'peak' } } }.
+        """
+        with self._lock:
+            hists = list( self.histograms.values() )
+            counters = { name: dict( per_thread ) for name, per_thread in self.counters.items() }
+            gauges = { name: { 'last': g[ 0 ], 'peak': g[ 1 ] } for name, g in self.gauges.items() }
+        return { 'histograms': { h.name: h.summary() for h in hists }, 'counters': counters,
+                 'gauges': gauges }
+
+    def reset( self ):
+        with self._lock:
+            for hist in self.histograms.values():
+                hist.reset()
+            self.counters = {}
+            self.gauges = {}
+
+    def report( self ):
+        """Print every instrument (called at exit, after the trigger log report)."""
+        snap = self.summary()
+        recorded = any( h[ 'count' ] for h in snap[ 'histograms' ].values() )
+        if not ( recorded or snap[ 'counters' ] or snap[ 'gauges' ] ):
+            return
+        print( f"\n{B_CYAN}=== Runtime Metrics ==={RESET}" )
+        for name in sorted( snap[ 'histograms' ] ):
+            h = snap[ 'histograms' ][ name ]
+            if not h[ 'count' ]:
+                continue
+            print( f"{BLUE}{name:<14}{RESET} {MAGENTA}{h[ 'count' ]}{RESET} samples, "
+                   f"mean {MAGENTA}{h[ 'mean' ]:.3f}{RESET} ms, p50 {MAGENTA}{h[ 'p50' ]:.3f}{RESET} ms, "
+                   f"p99 {MAGENTA}{h[ 'p99' ]:.3f}{RESET} ms, max {MAGENTA}{h[ 'max' ]:.3f}{RESET} ms" )
+        for name in sorted( snap[ 'counters' ] ):
+            per_thread = snap[ 'counters' ][ name ]
+            threads = ', '.join( f"{t} {MAGENTA}{n}{RESET}" for t, n in sorted( per_thread.items() ) )
+            print( f"{BLUE}{name:<14}{RESET} {MAGENTA}{sum( per_thread.values() )}{RESET} ({threads})" )
+        for name in sorted( snap[ 'gauges' ] ):
+            g = snap[ 'gauges' ][ name ]
+            print( f"{BLUE}{name:<14}{RESET} last {MAGENTA}{g[ 'last' ]}{RESET}, peak {MAGENTA}{g[ 'peak' ]}{RESET}" )
+
+
+# Module-level registry shared by every instrumented module
+METRICS = Metrics()
@@ -9,25 +9,26 @@ Capturing (as opposed to sending, which PxlIntercept handles) requires its own I
 with a keyboard filter and a blocking await/receive/send loop run on a background thread.
 """
 
+import heapq
+import itertools
+import math
 import random
 import threading
 import time
+from collections import deque
 from dataclasses import dataclass, field
 
 # Local pyinterception clone (do not modify)
 import pyinterception.src.interception as pyint
-from pyinterception.src.interception.constants import KeyFlag, FilterKeyFlag, MouseFlag, MouseButtonFlag
-from pyinterception.src.interception.strokes import KeyStroke, MouseStroke
+from pyinterception.src.interception.constants import KeyFlag, FilterKeyFlag
+from pyinterception.src.interception.strokes import KeyStroke
 from pyinterception.src.interception._keycodes import get_key_information
 
 from pxl_config import get_settings
-from pxl_intercept import detect_device_index
+from pxl_intercept import MOUSE_BUTTONS, compile_press, detect_device_index
 from pxl_lib import ColorCondition, PixelMonitor, CastLock
 from ansi import *
 
-# Substitute values for Action.key that send a mouse click at the current cursor position
-MOUSE_BUTTONS = frozenset( ( 'left', 'right', 'middle' ) )
-
 
 @dataclass
 class Action:
@@ -52,6 +53,9 @@ class Action:
     # Last fire time (perf_counter); negative means never fired
     last: float = field( default = -1.0, init = False )
 
+    # Prebuilt down/up strokes for `key` (pxl_intercept.PressStrokes), compiled by PxlRemapper.rebind
+    strokes: object = field( default = None, init = False, repr = False )
+
     def cooldown_ready( self ):
         return self.last < 0 or ( time.perf_counter() - self.last ) >= self.cooldown
 
@@ -79,6 +83,10 @@ class Rotation:
     def __init__( self, actions ):
         self.actions = actions
 
+        # ( action | None, perf_counter stamp ) published by the RotationPreResolver; None when
+        # unresolved or invalidated by a fire. Replaced wholesale, so readers never see it torn.
+        self.cached = None
+
     def resolve( self ):
         """Return the first action whose readiness predicate passes, or None."""
         for action in self.actions:
@@ -86,6 +94,76 @@ class Rotation:
                 return action
         return None
 
+    def resolve_cached( self, max_age ):
+        """
+        The pre-resolved next action when it is at most `max_age` seconds old (its cooldown is
+        re-checked, which reads no pixels); otherwise a live resolve().
+        """
+        cached = self.cached
+        if cached is not None and ( time.perf_counter() - cached[ 1 ] ) <= max_age:
+            action = cached[ 0 ]
+            if action is None or action.cooldown_ready():
+                return action
+        return self.resolve()
+
+
+class RotationPreResolver:
+    """
+    Background thread that keeps every bound rotation's next action current, so a key-down reads a
+    precomputed result instead of grabbing and testing pixels on the capture thread.
+
+    Each pass resolves every rotation (color checks read the shared frame cache) and publishes the
+    result with its timestamp. Passes run every `period` seconds (the frame lifetime, so each pass
+    sees a new frame), sooner when an action's cooldown is about to reopen, and immediately after
+    invalidate() (called on every fire, since a fire changes cooldowns). Passes are skipped while
+    the game context is inactive. A cached result is trusted for `max_age` seconds by
+    Rotation.resolve_cached, so its pixel staleness is bounded by frame age + max_age.
+    """
+
+    def __init__( self, remapper, period ):
+        self.remapper = remapper
+        self.period = period
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start( self ):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread( target = self._run, name = 'PxlPreResolve', daemon = True )
+        self._thread.start()
+
+    def stop( self ):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join( timeout = 1.0 )
+
+    def invalidate( self ):
+        """Drop every cached result and recompute now (cooldown state changed)."""
+        for _, rotation in list( self.remapper.remaps.values() ):
+            rotation.cached = None
+        self._wake.set()
+
+    def _run( self ):
+        while not self._stop.is_set():
+            self._wake.clear()
+            wait = self.period
+            rotations = [ rotation for _, rotation in list( self.remapper.remaps.values() ) ]
+            if self.remapper.hub.active:
+                for rotation in rotations:
+                    stamp = time.perf_counter()
+                    rotation.cached = ( rotation.resolve(), stamp )
+                    for action in rotation.actions:
+                        remaining = action.cooldown_remaining()
+                        if 0 < remaining < wait:
+                            wait = remaining
+            else:
+                for rotation in rotations:
+                    rotation.cached = None
+            self._wake.wait( wait )
+
 
 def _build_color_checks( color_check ):
     """
@@ -165,6 +243,17 @@ class PxlRemapper:
     swallowed. Sending on the loop thread also avoids racing the device's shared stroke buffer
     against receive().
 
+    A substitute's down stroke is sent immediately and its up stroke is deferred to a timed-release
+    heap serviced by the same loop: await_input's timeout shrinks to the next due release, so the
+    humanized hold never blocks the loop and passthrough typing/movement keeps flowing while a
+    substitute is held. A re-press of a key whose release is still pending sends that release first.
+
+    Presses of a rotation key that arrive during a cast are queued (remapper.cast_queue) rather than
+    dropped: at most `queue_depth` per rotation (further presses coalesce into the queued ones), each
+    valid for `queue_expiry` seconds. await_input's timeout shrinks to CastLock.remaining() while
+    the queue is non-empty, so the loop wakes exactly at cast end and fires the queued presses in
+    arrival order (a fired cast re-arms the lock and holds the rest until it, too, ends).
+
     This class also owns the application's command hotkeys (formerly the keyboard-library KEYBINDS):
     F12 / ESC quit, Ctrl+P reports the mouse color, and Ctrl+<reload_key> (default R) reloads
     profile.json. These are intercepted (not forwarded) and are not gated by wincheck.
@@ -174,7 +263,7 @@ class PxlRemapper:
                   hub = None, on_reload = None ):
         """
         Args:
-            wincheck (PxlWinCheck): gating; remaps apply only while wincheck.check() returns True.
+            wincheck (PxlWinCheck): gating; remaps apply only while wincheck.allowed() returns True.
             actions (dict): ACTIONS config { action_name: { key, cooldown, cast_time, color_check } }
             rotations (dict): ROTATIONS config { rotation_name: { key, actions: [ action_name ] } };
                 each rotation's `key` is the physical source key it captures.
@@ -208,6 +297,20 @@ class PxlRemapper:
         # the cast is not interrupted (armed by remap actions with cast_time and by reactions).
         self.cast_lock = cast_lock if cast_lock is not None else CastLock()
 
+        # Optional background pre-resolution of each rotation's next action (see RotationPreResolver)
+        self.PRERESOLVE_MAX_AGE = settings[ 'remapper' ][ 'preresolve_max_age' ]
+        self._preresolver = None
+        if settings[ 'remapper' ][ 'preresolve' ]:
+            self._preresolver = RotationPreResolver( self, settings[ 'app' ][ 'frame_max_age' ] )
+
+        # Cast-time press queue (loop thread only): FIFO of ( enqueued_at, Rotation ) plus the
+        # per-rotation depth used for coalescing
+        self.CAST_QUEUE = settings[ 'remapper' ][ 'cast_queue' ]
+        self.QUEUE_DEPTH = settings[ 'remapper' ][ 'queue_depth' ]
+        self.QUEUE_EXPIRY = settings[ 'remapper' ][ 'queue_expiry' ]
+        self._queue = deque()
+        self._queued = {}
+
         self.ctx = pyint.Interception()
         self.ctx.set_filter( self.ctx.is_keyboard, FilterKeyFlag.FILTER_KEY_ALL )
 
@@ -240,20 +343,64 @@ class PxlRemapper:
         # Ctrl+P toggles this single-pixel screen-discovery monitor
         self._pixel_monitor = PixelMonitor()
 
+        # Config and pools of the current binding: ( actions_cfg, rotations_cfg, action_pool,
+        # rotation_pool ), diffed by rebind so a reload rebuilds only what changed
+        self._bound = ( {}, {}, {}, {} )
+        self.down = {}
         self.rebind( actions, rotations )
 
+        # Deferred substitute releases: heap of [ due, seq, device, up_strokes, key_id ]; _held maps
+        # key_id -> its live entry (a flushed entry is skipped when it surfaces). Loop thread only.
+        self._releases = []
+        self._held = {}
+        self._seq = itertools.count()
+
         self._stop_event = threading.Event()
         self._thread = None
         self.start()
 
+    def apply_settings( self, remap_cfg, frame_max_age = None ):
+        """
+        Apply a reloaded `[remapper]` section's live settings (holds, cast queue, pre-resolve age),
+        and a reloaded app.frame_max_age as the pre-resolver's period.
+        """
+        self.MIN_HOLD = remap_cfg[ 'min_hold' ]
+        self.MAX_HOLD = remap_cfg[ 'max_hold' ]
+        self.CAST_QUEUE = remap_cfg[ 'cast_queue' ]
+        self.QUEUE_DEPTH = remap_cfg[ 'queue_depth' ]
+        self.QUEUE_EXPIRY = remap_cfg[ 'queue_expiry' ]
+        self.PRERESOLVE_MAX_AGE = remap_cfg[ 'preresolve_max_age' ]
+        if self._preresolver is not None and frame_max_age is not None:
+            self._preresolver.period = frame_max_age
+
     def rebind( self, actions, rotations ):
         """
         (Re)build the action pool, rotations, and source-key bindings from config. Called at
         construction and again on profile reload; the loop thread reads `self.remaps` on each
-        stroke, so swapping in fresh dicts takes effect immediately (cooldown state resets).
+        stroke, so swapping in fresh dicts takes effect immediately.
+
+        Only new or edited entries are built: an action whose config is unchanged keeps its Action
+        (and its cooldown state), and a rotation whose config and actions are all unchanged keeps
+        its Rotation (queued presses and its pre-resolved result stay valid). Returns the number of
+        ( actions, rotations ) built.
         """
-        action_pool = build_actions( actions )
-        rotation_pool = build_rotations( rotations, action_pool )
+        old_actions, old_rotations, old_action_pool, old_rotation_pool = self._bound
+
+        built = build_actions( { name: cfg for name, cfg in actions.items() if old_actions.get( name ) != cfg } )
+        # Precompile every new substitute so a fire is only prebuilt-buffer sends
+        for action in built.values():
+            action.strokes = compile_press( action.key )
+        action_pool = { name: built[ name ] if name in built else old_action_pool[ name ] for name in actions }
+
+        kept = {}
+        for name, cfg in rotations.items():
+            rotation = old_rotation_pool.get( name )
+            if rotation is not None and old_rotations.get( name ) == cfg and all(
+                    action is action_pool.get( action.name ) for action in rotation.actions ):
+                kept[ name ] = rotation
+        rotation_pool = build_rotations( { name: cfg for name, cfg in rotations.items() if name not in kept },
+                                         action_pool )
+        rotation_pool.update( kept )
 
         # source-scancode -> remap lookup, plus per-source down-state for once-per-press
         new_remaps = {}     # scan_code -> ( extended_bool, Rotation )
@@ -262,14 +409,17 @@ class PxlRemapper:
         for rotation_name, cfg in rotations.items():
             info = get_key_information( cfg[ 'key' ] )
             new_remaps[ info.scan_code ] = ( info.is_extended, rotation_pool[ rotation_name ] )
-            new_down[ info.scan_code ] = False
+            new_down[ info.scan_code ] = self.down.get( info.scan_code, False )
             rotation_view.append( ( rotation_name, rotation_pool[ rotation_name ] ) )
-            print( f"ℹ️ {GREEN}PxlRemapper{RESET}: bound {CYAN}{cfg[ 'key' ]}{RESET} "
-                   f"(scan {MAGENTA}0x{info.scan_code:02x}{RESET}) -> rotation {MAGENTA}{rotation_name}{RESET}" )
+            if rotation_name not in kept:
+                print( f"ℹ️ {GREEN}PxlRemapper{RESET}: bound {CYAN}{cfg[ 'key' ]}{RESET} "
+                       f"(scan {MAGENTA}0x{info.scan_code:02x}{RESET}) -> rotation {MAGENTA}{rotation_name}{RESET}" )
 
         self.remaps = new_remaps
         self.down = new_down
+        self._bound = ( dict( actions ), dict( rotations ), action_pool, rotation_pool )
         self.hub.set_rotation_view( rotation_view )
+        return len( built ), len( rotation_pool ) - len( kept )
 
     def start( self ):
         if self._thread and self._thread.is_alive():
@@ -277,11 +427,15 @@ class PxlRemapper:
         self._stop_event.clear()
         self._thread = threading.Thread( target = self._run, name = 'PxlRemapper', daemon = True )
         self._thread.start()
+        if self._preresolver is not None:
+            self._preresolver.start()
 
     def stop( self ):
         print( f"ℹ️ {YELLOW}Closing PxlRemapper...{RESET}" )
         self._stop_event.set()
         self._pixel_monitor.stop()
+        if self._preresolver is not None:
+            self._preresolver.stop()
         if self._thread:
             self._thread.join( timeout = 2.0 )
         try:
@@ -305,7 +459,10 @@ class PxlRemapper:
     def _run( self ):
         try:
             while not self._stop_event.is_set():
-                device = self.ctx.await_input( self.AWAIT_TIMEOUT_MS )
+                device = self.ctx.await_input( self._await_timeout_ms() )
+                self._send_due_releases()
+                if self._queue:
+                    self._flush_queue()
                 if device is None:
                     continue
 
@@ -342,24 +499,26 @@ class PxlRemapper:
 
                 self.down[ scan_code ] = True
 
-                if not self.wincheck.check():
+                if not self.wincheck.allowed():
                     # Outside the target app: behave like the real key (silently)
                     self.ctx.send( device, stroke )
                     continue
 
                 if self.cast_lock.active():
-                    # A cast is in progress; drop this press so the cast is not interrupted and
-                    # flash the status bar frame.
-                    # FUTURE: to queue instead of dropping, buffer the rotation here and flush at
-                    # cast-end by shrinking the await_input timeout to wake the loop when the cast
-                    # elapses, then resolve/fire each buffered press in order.
-                    self.hub.record_drop()
+                    # A cast is in progress; queue the press for cast end (or, with queueing off,
+                    # drop it and flash the status bar frame) so the cast is not interrupted
+                    if self.CAST_QUEUE:
+                        self._enqueue( rotation )
+                    else:
+                        self.hub.record_drop()
                     continue
 
                 self._fire( rotation )
         except Exception as exc:
             print( f"{RED}PxlRemapper loop error: {exc}{RESET}" )
         finally:
+            # Never leave an injected key held down
+            self._send_due_releases( flush = True )
             try:
                 self.ctx.destroy()
             except Exception:
@@ -410,51 +569,105 @@ class PxlRemapper:
 
         return False
 
-    def _press_substitute( self, key ):
+    def _await_timeout_ms( self ):
         """
-        Inject a single press of `key` through the capture context.
-
-        `key` may be a keyboard key name or a mouse button (left / right / middle). Keyboard
-        substitutes use KeyStrokes on ctx.keyboard; mouse substitutes send button down/up on
-        ctx.mouse at the current cursor position (no pointer move). Modifier-bearing keyboard
-        substitutes are not supported; game remaps use bare keys or mouse buttons.
+        await_input timeout: the stop-flag poll interval, shrunk to the next due release and, while
+        presses are queued, to the end of the current cast.
         """
-        hold = random.uniform( self.MIN_HOLD, self.MAX_HOLD )
-        btn = key.lower()
-        if btn in MOUSE_BUTTONS:
-            down_flag, up_flag = MouseButtonFlag.from_string( btn )
-            self.ctx.send( self.ctx.mouse,
-                           MouseStroke( MouseFlag.MOUSE_MOVE_ABSOLUTE, down_flag, 0, 0, 0 ) )
-            time.sleep( hold )
-            self.ctx.send( self.ctx.mouse,
-                           MouseStroke( MouseFlag.MOUSE_MOVE_ABSOLUTE, up_flag, 0, 0, 0 ) )
+        wait = self.AWAIT_TIMEOUT_MS / 1000.0
+        if self._releases:
+            wait = min( wait, self._releases[ 0 ][ 0 ] - time.perf_counter() )
+        if self._queue:
+            wait = min( wait, self.cast_lock.remaining() )
+        return max( 0, math.ceil( wait * 1000 ) )
+
+    def _enqueue( self, rotation ):
+        """Queue a press of `rotation` that arrived during a cast (coalesced at queue_depth)."""
+        if self._queued.get( rotation, 0 ) >= self.QUEUE_DEPTH:
+            self.hub.record_queue( 'coalesced', len( self._queue ) )
             return
+        self._queued[ rotation ] = self._queued.get( rotation, 0 ) + 1
+        self._queue.append( ( time.perf_counter(), rotation ) )
+        self.hub.record_queue( 'queued', len( self._queue ) )
 
-        info = get_key_information( key )
+    def _flush_queue( self ):
+        """
+        Fire queued presses in arrival order while no cast is active. Presses past queue_expiry,
+        from a rotation replaced by a profile reload, or arriving outside the target app expire.
+        """
+        while self._queue and not self.cast_lock.active():
+            enqueued_at, rotation = self._queue.popleft()
+            self._queued[ rotation ] -= 1
+            if not self._queued[ rotation ]:
+                del self._queued[ rotation ]
+
+            stale = ( time.perf_counter() - enqueued_at ) > self.QUEUE_EXPIRY
+            live = any( rotation is r for _, r in self.remaps.values() )
+            if stale or not live or not self.wincheck.allowed():
+                self.hub.record_queue( 'expired', len( self._queue ) )
+                continue
+            self._fire( rotation )
+            self.hub.record_queue( 'flushed', len( self._queue ) )
+
+    def _send_due_releases( self, flush = False ):
+        """Send every deferred release whose hold has elapsed (all of them when `flush`)."""
+        now = time.perf_counter()
+        while self._releases and ( flush or self._releases[ 0 ][ 0 ] <= now ):
+            entry = heapq.heappop( self._releases )
+            if self._held.get( entry[ 4 ] ) is not entry:
+                continue
+            del self._held[ entry[ 4 ] ]
+            try:
+                for stroke in entry[ 3 ]:
+                    self.ctx.send( entry[ 2 ], stroke )
+            except Exception:
+                pass
+
+    def _release_now( self, key_id ):
+        """Send `key_id`'s pending release immediately (before it is pressed again)."""
+        entry = self._held.pop( key_id, None )
+        if entry is not None:
+            for stroke in entry[ 3 ]:
+                self.ctx.send( entry[ 2 ], stroke )
 
-        down = KeyStroke( info.scan_code, KeyFlag.KEY_DOWN )
-        up = KeyStroke( info.scan_code, KeyFlag.KEY_UP )
-        if info.is_extended:
-            down.flags |= KeyFlag.KEY_E0
-            up.flags |= KeyFlag.KEY_E0
+    def _press_substitute( self, strokes ):
+        """
+        Inject a single press through the capture context: the down strokes now, the up strokes
+        after a humanized hold via the timed-release heap (the loop does not sleep).
+
+        `strokes` is the action's precompiled PressStrokes (see pxl_intercept.compile_press).
+        Keyboard substitutes go to ctx.keyboard; mouse substitutes send button down/up on ctx.mouse
+        at the current cursor position (no pointer move).
+        """
+        hold = random.uniform( self.MIN_HOLD, self.MAX_HOLD )
+        device = self.ctx.keyboard if strokes.device == 'keyboard' else self.ctx.mouse
 
-        self.ctx.send( self.ctx.keyboard, down )
-        time.sleep( hold )
-        self.ctx.send( self.ctx.keyboard, up )
+        self._release_now( strokes.key_id )
+        for stroke in strokes.down:
+            self.ctx.send( device, stroke )
+        entry = [ time.perf_counter() + hold, next( self._seq ), device, strokes.up, strokes.key_id ]
+        self._held[ strokes.key_id ] = entry
+        heapq.heappush( self._releases, entry )
 
     def _fire( self, rotation ):
         """
         Resolve the rotation and send the chosen action's key (if any). An action with a cast_time
         arms the global cast lock so subsequent presses are dropped until the cast completes. The
         fired ability is published to the hub; a press with nothing ready is silent (the status
-        bar's live rotation rows already show why).
+        bar's live rotation rows already show why). With pre-resolution on, a fresh precomputed
+        result is used instead of resolving (no pixel reads on this thread).
         """
-        action = rotation.resolve()
+        if self._preresolver is not None:
+            action = rotation.resolve_cached( self.PRERESOLVE_MAX_AGE )
+        else:
+            action = rotation.resolve()
         if action is None:
             return
 
-        self._press_substitute( action.key )
+        self._press_substitute( action.strokes )
         action.fire()
+        if self._preresolver is not None:
+            self._preresolver.invalidate()
 
         if action.cast_time > 0:
             self.cast_lock.arm( action.cast_time )
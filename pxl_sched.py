@@ -0,0 +1,152 @@
+"""
+pxl_sched.py paces the main poll loop.
+
+The loop used to sleep a fixed tick_interval AFTER its work, so the real period was work +
+tick_interval and drifted with grab cost. TickScheduler instead keeps an absolute deadline per tick
+and sleeps only the remainder, so the period is the configured rate regardless of work time. An
+overrun (work longer than the period) is counted and the schedule resyncs rather than bursting to
+catch up.
+
+Adaptive mode picks the period per tick: the fast interval while a reaction has a pending confirm
+streak or the screen changed within `hot_hold` seconds (so confirmations and fresh changes are
+sampled densely), the idle interval while the game context is inactive or the screen has been
+static for `idle_after` seconds, and the normal interval otherwise.
+
+wait() also takes an optional earlier wake time (the ReactionTable's next confirm/readiness
+deadline): the scheduler sleeps to that instead, returns False so the caller can service the
+event, and the next wait() resumes toward the same tick deadline.
+"""
+
+import time
+
+from pxl_metrics import METRICS
+
+_JITTER_HIST = METRICS.histogram( 'jitter_us' )
+
+
+class TickScheduler:
+    """
+    Absolute-deadline pacer for the poll loop. Fixed mode ticks every `interval`; adaptive mode
+    lets choose() pick the fast, normal, or idle period for each tick from the loop's activity.
+
+    wait( until ) sleeps to the tick deadline and returns True, or - when `until` falls first -
+    sleeps only to `until` and returns False without consuming the tick, so the caller can service
+    that early deadline and call wait() again toward the same tick.
+    """
+
+    def __init__( self, interval, adaptive = False, fast_interval = None, idle_interval = None,
+                  idle_after = 2.0, hot_hold = 0.25 ):
+        """
+        Args:
+            interval (float): Normal tick period in seconds (settings app.tick_interval).
+            adaptive (bool): Vary the period with activity (see module docstring).
+            fast_interval (float | None): Period while hurrying; defaults to `interval`.
+            idle_interval (float | None): Period while idle; defaults to `interval`.
+            idle_after (float): Seconds without a screen change before backing off to idle.
+            hot_hold (float): Seconds after a screen change that the fast period persists.
+        """
+        self.interval = interval
+        self.adaptive = adaptive
+        self.fast_interval = fast_interval or interval
+        self.idle_interval = idle_interval or interval
+        self.idle_after = idle_after
+        self.hot_hold = hot_hold
+
+        # Period chosen for the tick in progress
+        self.current = interval
+
+        self._due = None
+        # True once the current tick's deadline has been advanced (between early wakes)
+        self._armed = False
+        self._last_change = time.perf_counter()
+
+        # Rate/jitter window since the last reset_stats(); overruns count since construction
+        self.ticks = 0
+        self.overruns = 0
+        self.early_wakes = 0
+        self._stats_since = time.perf_counter()
+        self._jitter_sum = 0.0
+        self._jitter_max = 0.0
+
+    def start( self ):
+        """Anchor the schedule at now; the first tick is due immediately."""
+        self._due = time.perf_counter()
+
+    def choose( self, active = True, pending = False, changed = False ):
+        """
+        Pick the period for the next sleep from this tick's activity. `pending` is True while any
+        reaction has a confirm streak running; `changed` is True when the sampled pixels moved.
+        """
+        now = time.perf_counter()
+        if changed:
+            self._last_change = now
+        if not self.adaptive:
+            self.current = self.interval
+        elif active and ( pending or ( now - self._last_change ) < self.hot_hold ):
+            self.current = self.fast_interval
+        elif not active or ( now - self._last_change ) >= self.idle_after:
+            self.current = self.idle_interval
+        else:
+            self.current = self.interval
+        return self.current
+
+    def wait( self, until = None ):
+        """
+        Sleep until the next tick's deadline (previous deadline + the chosen period) and return
+        True. When `until` (a perf_counter time) falls before that deadline, sleep only to `until`
+        and return False; call wait() again after servicing the event. An overrun - the deadline
+        already passed - is counted and the schedule resyncs to now.
+        """
+        if self._due is None:
+            self.start()
+        if not self._armed:
+            self._armed = True
+            self._due += self.current
+            now = time.perf_counter()
+            if now > self._due:
+                self.overruns += 1
+                METRICS.count( 'tick_overruns' )
+                self._due = now
+
+        if until is not None and until < self._due:
+            delay = until - time.perf_counter()
+            if delay > 0:
+                time.sleep( delay )
+            self.early_wakes += 1
+            return False
+
+        delay = self._due - time.perf_counter()
+        if delay > 0:
+            time.sleep( delay )
+        self._armed = False
+
+        late = max( 0.0, time.perf_counter() - self._due )
+        _JITTER_HIST.record( late )
+        self.ticks += 1
+        self._jitter_sum += late
+        if late > self._jitter_max:
+            self._jitter_max = late
+        return True
+
+    def stats( self ):
+        """
+        Achieved rate (Hz), mean/max wake-up jitter (ms), total overruns and deadline (early)
+        wakes, and the current period.
+        """
+        elapsed = max( 1e-9, time.perf_counter() - self._stats_since )
+        ticks = max( 1, self.ticks )
+        return {
+            'rate': self.ticks / elapsed,
+            'jitter_ms': 1000.0 * self._jitter_sum / ticks,
+            'jitter_max_ms': 1000.0 * self._jitter_max,
+            'overruns': self.overruns,
+            'early_wakes': self.early_wakes,
+            'period_ms': 1000.0 * self.current,
+        }
+
+    def reset_stats( self ):
+        """Start a new rate/jitter window (the poll loop publishes and resets about once a second)."""
+        self.ticks = 0
+        self._stats_since = time.perf_counter()
+        self._jitter_sum = 0.0
+        self._jitter_max = 0.0
@@ -0,0 +1,295 @@
+"""
+pxl_schema.py declares the structure of profile.json and compiles it into a validator.
+
+The schema is a tree of nodes (Obj, MapOf, ListOf, Num, Str, Color, ...). Each node compiles itself
+once, at import, into a closure check( value, path, errors, root ) that appends one "path: message"
+string per problem instead of raising, so a single pass reports every error in the document with
+its JSON path (e.g. `$.reactions.HP1.confirm`). `root` is the whole profile, for the checks that
+look across sections (rotation action references, unique rotation keys).
+
+validate_profile() runs on an in-memory, JSON-shaped profile dict: the whole document, or just the
+subtree being edited (e.g. ( 'reactions', 'HP1' )), with no file I/O. pxl_config.load_profile
+validates with it before normalizing, and the editor validates on every edit and before saving.
+"""
+
+REACTION_TYPES = ( "react_if_color", "react_if_not_color" )
+
+
+def _join( path, key ):
+    return f"{path}[{key}]" if isinstance( key, int ) else f"{path}.{key}"
+
+
+class Node:
+    """Schema node; subclasses set `check` (the compiled closure) in their constructor."""
+
+    check = None
+
+    def child( self, key ):
+        """The node validating `key` within this node's value (subtree validation)."""
+        raise KeyError( key )
+
+
+class Any( Node ):
+    """Accepts every value (fields the loader coerces, e.g. with bool())."""
+
+    def __init__( self ):
+        def check( value, path, errors, root ):
+            pass
+        self.check = check
+
+
+class Num( Node ):
+    """A number in [lo, hi) (or (lo, hi) when `open_lo`); `integer` rejects floats."""
+
+    def __init__( self, lo, hi = None, open_lo = False, integer = False ):
+        kind = "an integer" if integer else "a number"
+        types = int if integer else ( int, float )
+        span = f"{'(' if open_lo else '['}{lo}, {hi})" if hi is not None else f">= {lo}"
+
+        def check( value, path, errors, root ):
+            if isinstance( value, bool ) or not isinstance( value, types ):
+                errors.append( f"{path}: expected {kind}, got {value!r}" )
+            elif value < lo or ( open_lo and value == lo ) or ( hi is not None and value >= hi ):
+                errors.append( f"{path}: {value} is outside {span}" )
+        self.check = check
+
+
+class Str( Node ):
+    """A non-empty string."""
+
+    def __init__( self ):
+        def check( value, path, errors, root ):
+            if not ( isinstance( value, str ) and value ):
+                errors.append( f"{path}: expected a non-empty string, got {value!r}" )
+        self.check = check
+
+
+class Enum( Node ):
+    """One of a fixed set of values."""
+
+    def __init__( self, values ):
+        def check( value, path, errors, root ):
+            if value not in values:
+                errors.append( f"{path}: expected one of {', '.join( values )}, got {value!r}" )
+        self.check = check
+
+
+class Color( Node ):
+    """An RGB triple of 0..255 integers."""
+
+    def __init__( self ):
+        def check( value, path, errors, root ):
+            if not ( isinstance( value, ( list, tuple ) ) and len( value ) == 3
+                     and all( isinstance( c, int ) and not isinstance( c, bool ) and 0 <= c <= 255
+                              for c in value ) ):
+                errors.append( f"{path}: expected an [r, g, b] color (0-255), got {value!r}" )
+        self.check = check
+
+
+class ListOf( Node ):
+    """A list whose items are each validated by `item`."""
+
+    def __init__( self, item, min_len = 0, single = False, nullable = False, empty = False ):
+        """
+        `single` also accepts one bare item in place of the list (the loader wraps it); `nullable`
+        accepts null (the loader treats it as absent); `empty` accepts any empty value - null, {},
+        [], "" - as absent, for a loader that reads the field with `or []`.
+        """
+        self.item = item
+        item_check = item.check
+
+        def check( value, path, errors, root ):
+            if ( nullable and value is None ) or ( empty and not value ):
+                return
+            if single and isinstance( value, dict ):
+                item_check( value, path, errors, root )
+                return
+            if not isinstance( value, list ):
+                errors.append( f"{path}: expected a list, got {value!r}" )
+                return
+            if len( value ) < min_len:
+                errors.append( f"{path}: expected at least {min_len} item(s)" )
+            for i, entry in enumerate( value ):
+                item_check( entry, _join( path, i ), errors, root )
+        self.check = check
+
+    def child( self, key ):
+        return self.item
+
+
+class Obj( Node ):
+    """An object with a known set of fields, some required."""
+
+    def __init__( self, fields, required = (), rules = () ):
+        """
+        Args:
+            fields (dict): key -> Node for every known key (unknown keys are ignored).
+            required (tuple): keys that must be present; the rest fall back to loader defaults.
+            rules (tuple): extra check( value, path, errors, root ) callables run on a dict value.
+        """
+        self.fields = fields
+        checks = [ ( key, node.check, key in required ) for key, node in fields.items() ]
+
+        def check( value, path, errors, root ):
+            if not isinstance( value, dict ):
+                errors.append( f"{path}: expected an object, got {value!r}" )
+                return
+            for key, field_check, needed in checks:
+                if key in value:
+                    field_check( value[ key ], _join( path, key ), errors, root )
+                elif needed:
+                    errors.append( f"{_join( path, key )}: required" )
+            for rule in rules:
+                rule( value, path, errors, root )
+        self.check = check
+
+    def child( self, key ):
+        return self.fields[ key ]
+
+
+class MapOf( Node ):
+    """An object of user-named entries, each validated by `value`."""
+
+    def __init__( self, value ):
+        self.value = value
+        value_check = value.check
+
+        def check( data, path, errors, root ):
+            if not isinstance( data, dict ):
+                errors.append( f"{path}: expected an object, got {data!r}" )
+                return
+            for name, entry in data.items():
+                value_check( entry, _join( path, name ), errors, root )
+        self.check = check
+
+    def child( self, key ):
+        return self.value
+
+
+class Switch( Node ):
+    """Dispatch on a tag field (with a default) to one Obj per tag value."""
+
+    def __init__( self, tag, default, variants ):
+        checks = { name: node.check for name, node in variants.items() }
+
+        def check( value, path, errors, root ):
+            if not isinstance( value, dict ):
+                errors.append( f"{path}: expected an object, got {value!r}" )
+                return
+            kind = value.get( tag, default )
+            variant = checks.get( kind )
+            if variant is None:
+                errors.append( f"{_join( path, tag )}: expected one of {', '.join( checks )}, got {kind!r}" )
+                return
+            variant( value, path, errors, root )
+        self.check = check
+
+
+class Ref( Node ):
+    """The name of an entry in root[ section ]."""
+
+    def __init__( self, section ):
+        def check( value, path, errors, root ):
+            if not ( isinstance( value, str ) and value ):
+                errors.append( f"{path}: expected a non-empty string, got {value!r}" )
+                return
+            entries = root.get( section ) if isinstance( root, dict ) else None
+            if isinstance( entries, dict ) and value not in entries:
+                errors.append( f"{path}: unknown {section[ :-1 ]} {value!r}" )
+        self.check = check
+
+
+# ------------------------------------------------------------------------------------ rules
+
+
+def _reaction_cooldown( value, path, errors, root ):
+    """Without a `ready` list, a reaction's `cooldown` shorthand is required (never > 3 minutes)."""
+    if value.get( "ready" ) is None:
+        if "cooldown" not in value:
+            errors.append( f"{_join( path, 'cooldown' )}: required when there is no ready list" )
+        else:
+            COOLDOWN.check( value[ "cooldown" ], _join( path, "cooldown" ), errors, root )
+
+
+def _rotation_key_unique( value, path, errors, root ):
+    """A rotation's source key must not be bound by any other rotation."""
+    rotations = root.get( "rotations" ) if isinstance( root, dict ) else None
+    if not isinstance( rotations, dict ):
+        return
+    for name, other in rotations.items():
+        if other is not value and isinstance( other, dict ) and other.get( "key" ) == value.get( "key" ):
+            errors.append( f"{_join( path, 'key' )}: {value.get( 'key' )!r} is also bound by rotation {name!r}" )
+            return
+
+
+# ----------------------------------------------------------------------------------- schema
+
+X = Num( -2560, 2560, integer = True )
+Y = Num( 0, 1440, integer = True )
+TOLERANCE = Num( 0, integer = True )
+COOLDOWN = Num( 0, 180, open_lo = True )
+CAST_TIME = Num( 0, 10 )
+
+MARKER = Obj( { "x": X, "y": Y, "color": Color(), "tolerance": TOLERANCE },
+              required = ( "x", "y", "color" ) )
+
+READY = Switch( "type", "cooldown", {
+    "color": Obj( { "type": Any(), "px": X, "py": Y, "color": Color(), "tolerance": TOLERANCE,
+                    "lockout": Num( 0, 10 ) },
+                  required = ( "px", "py", "color" ) ),
+    "cooldown": Obj( { "type": Any(), "cooldown": COOLDOWN }, required = ( "cooldown", ) ),
+} )
+
+REACTION = Obj( {
+    "enabled": Any(),
+    "x": X,
+    "y": Y,
+    "type": Enum( REACTION_TYPES ),
+    "color": Color(),
+    "tolerance": TOLERANCE,
+    "confirm": Num( 0, 2 ),
+    "ready": ListOf( READY, single = True, nullable = True ),
+    "cast_time": CAST_TIME,
+    "ignore_colors": ListOf( Color() ),
+    "press": Str(),
+}, required = ( "x", "y", "type", "color", "press" ), rules = ( _reaction_cooldown, ) )
+
+COLOR_CHECK = Obj( { "px": X, "py": Y, "color": Color(), "match": Any(), "tolerance": TOLERANCE },
+                   required = ( "px", "py", "color" ) )
+
+ACTION = Obj( {
+    "key": Str(),
+    "cooldown": Num( 0, 180 ),
+    "cast_time": CAST_TIME,
+    "color_check": ListOf( COLOR_CHECK, single = True, empty = True ),
+}, required = ( "key", ) )
+
+ROTATION = Obj( { "key": Str(), "actions": ListOf( Ref( "actions" ), min_len = 1 ) },
+                required = ( "key", "actions" ), rules = ( _rotation_key_unique, ) )
+
+PROFILE_SCHEMA = Obj( {
+    "wincheck": Obj( { "target_window": Str(), "markers": ListOf( MARKER, min_len = 1 ) },
+                     required = ( "target_window", "markers" ) ),
+    "reactions": MapOf( REACTION ),
+    "actions": MapOf( ACTION ),
+    "rotations": MapOf( ROTATION ),
+}, required = ( "wincheck", "reactions", "actions", "rotations" ) )
+
+
+def validate_profile( profile, subtree = () ):
+    """
+    Validate a JSON-shaped profile dict in memory. Returns every problem as a "path: message"
+    string (empty when valid). `subtree` limits the check to one part, e.g. ( 'reactions', 'HP1' )
+    or ( 'wincheck', ), still resolving cross-section references against the whole `profile`.
+    """
+    node, value, path = PROFILE_SCHEMA, profile, "$"
+    for key in subtree:
+        try:
+            node = node.child( key )
+            value = value[ key ]
+        except ( KeyError, IndexError, TypeError ):
+            return [ f"{_join( path, key )}: not found" ]
+        path = _join( path, key )
+    errors = []
+    node.check( value, path, errors, profile )
+    return errors
@@ -8,8 +8,9 @@ The hub deliberately does NOT import dearpygui, so a headless run (statusbar dis
 no GUI dependency.
 
 Publishers / threads:
-- main poll loop: set_active(), reaction fires (via PxlReactionRegistry._log_reaction)
-- PxlRemapper thread: ability fires (record_ability), presses dropped during a cast (record_drop)
+- main poll loop: set_active(), set_tick_stats(), set_metrics(), reaction fires (via PxlReactionRegistry._log_reaction)
+- PxlRemapper thread: ability fires (record_ability), presses dropped during a cast (record_drop),
+  cast-time press queue events (record_queue)
 Consumers: the status bar render thread reads snapshots under the same lock.
 """
 
@@ -27,6 +28,12 @@ class StatusHub:
 
         self.active = False
 
+        # Poll loop pacing from TickScheduler.stats(): rate, jitter, overruns (None until published)
+        self.tick = None
+
+        # pxl_metrics.METRICS.summary(): latency histograms and per-thread counters (None until published)
+        self.metrics = None
+
         # Armed by attach(); lets the status bar show live cast-lock state
         self.cast_lock = None
 
@@ -42,6 +49,10 @@ class StatusHub:
         # monotonic deadline while the frame flash is active (press dropped during a cast)
         self.flash_until = 0.0
 
+        # Cast-time press queue: current depth and cumulative queued/coalesced/flushed/expired counts
+        self.queue_depth = 0
+        self.queue_counts = { 'queued': 0, 'coalesced': 0, 'flushed': 0, 'expired': 0 }
+
     # ------------------------------------------------------------------ wiring
 
     def attach( self, cast_lock ):
@@ -70,6 +81,14 @@ class StatusHub:
     def set_active( self, active ):
         self.active = active
 
+    def set_tick_stats( self, stats ):
+        """Latest TickScheduler.stats() dict; replaced wholesale, so readers never see it torn."""
+        self.tick = stats
+
+    def set_metrics( self, summary ):
+        """Latest METRICS.summary() snapshot (a fresh dict each publish)."""
+        self.metrics = summary
+
     def record_reaction( self, name, delta_text, rgb ):
         """One reaction firing."""
         now = time.strftime( "%H:%M:%S", time.localtime() )
@@ -88,6 +107,12 @@ class StatusHub:
         with self._lock:
             self.flash_until = time.perf_counter() + FLASH_SECONDS
 
+    def record_queue( self, event, depth ):
+        """A cast-time queue event ('queued', 'coalesced', 'flushed', 'expired'); `depth` after it."""
+        with self._lock:
+            self.queue_counts[ event ] += 1
+            self.queue_depth = depth
+
     # --------------------------------------------------------------- consumers
 
     def snapshot( self ):
@@ -98,9 +123,13 @@ class StatusHub:
         with self._lock:
             return {
                 'active': self.active,
+                'tick': self.tick,
+                'metrics': self.metrics,
                 'casting': self.cast_lock.active() if self.cast_lock is not None else False,
                 'reactions': { name: dict( row ) for name, row in self.reactions.items() },
                 'rotation_view': list( self.rotation_view ),
                 'last_ability': self.last_ability,
                 'flash': time.perf_counter() < self.flash_until,
+                'queue_depth': self.queue_depth,
+                'queue_counts': dict( self.queue_counts ),
             }
@@ -13,7 +13,8 @@ The bar runs its own render loop on a daemon thread (DPG 2.x is thread-safe) and
 snapshots each frame; the 40 Hz poll loop on the main thread is untouched. Live rotation cooldowns
 are computed from shared Action state (no pixel reads); rotation color checks DO read pixels, so
 they refresh at the lower `color_check_hz` rate and only while the app context is active, keeping
-GDI contention with the poll loop negligible.
+GDI contention with the poll loop negligible. A verdict another thread already computed for the
+current frame (ColorCondition's per-frame memo) is shown on every render at no cost.
 
 This module is imported only when gui.statusbar_enabled is true, so headless runs never touch
 dearpygui. Closing the status bar window kills only the bar; the core keeps running.
@@ -56,6 +57,11 @@ class StatusBar:
         self._flash_theme = None
         self._flash_bound = False
 
+    def apply_settings( self, gui_cfg ):
+        """Apply a reloaded `[gui]` section's live settings (refresh rates) to the running bar."""
+        self.fps = gui_cfg[ 'fps' ]
+        self.color_interval = 1.0 / gui_cfg[ 'color_check_hz' ]
+
     def start( self ):
         if self._thread and self._thread.is_alive():
             return
@@ -94,6 +100,8 @@ class StatusBar:
                 with dpg.group( horizontal = True ):
                     dpg.add_text( 'INACTIVE', tag = 'sb_active', color = GREY_C )
                     dpg.add_text( '', tag = 'sb_cast', color = RED_C )
+                    dpg.add_text( '', tag = 'sb_tick', color = GREY_C )
+                dpg.add_text( '', tag = 'sb_metrics', color = GREY_C )
                 dpg.add_separator()
                 dpg.add_text( 'rotations', color = GREY_C )
                 dpg.add_group( tag = 'sb_rotations' )
@@ -106,9 +114,9 @@ class StatusBar:
             dpg.show_viewport()
 
             frame = 0
-            interval = 1.0 / self.fps
             while dpg.is_dearpygui_running() and not self._stop.is_set():
                 started = time.perf_counter()
+                interval = 1.0 / self.fps
                 self._refresh()
                 dpg.render_dearpygui_frame()
                 frame += 1
@@ -134,7 +142,22 @@ class StatusBar:
         else:
             dpg.set_value( 'sb_active', 'INACTIVE' )
             dpg.configure_item( 'sb_active', color = GREY_C )
-        dpg.set_value( 'sb_cast', 'CASTING' if snap[ 'casting' ] else '' )
+        cast_text = 'CASTING' if snap[ 'casting' ] else ''
+        if snap[ 'queue_depth' ]:
+            cast_text += f"  +{snap[ 'queue_depth' ]} queued"
+        dpg.set_value( 'sb_cast', cast_text )
+        tick = snap[ 'tick' ]
+        if tick is not None:
+            dpg.set_value( 'sb_tick', f"{tick[ 'rate' ]:.0f} Hz  +{tick[ 'jitter_ms' ]:.1f} ms  "
+                                      f"{tick[ 'overruns' ]} over" )
+        metrics = snap[ 'metrics' ]
+        if metrics is not None:
+            hists = metrics[ 'histograms' ]
+            parts = [ f"{label} p99 {hists[ name ][ 'p99' ]:.1f}"
+                      for name, label in ( ( 'grab_us', 'grab' ), ( 'tick_us', 'tick' ),
+                                           ( 'onset_fire_us', 'fire' ) )
+                      if name in hists and hists[ name ][ 'count' ] ]
+            dpg.set_value( 'sb_metrics', '  '.join( parts ) + ( ' ms' if parts else '' ) )
 
         self._refresh_rotations( snap )
         self._refresh_reactions( snap )
@@ -184,9 +207,14 @@ class StatusBar:
                 glyphs = ''
                 colors_ok = True
                 for cond in action.color_checks:
-                    if refresh_colors:
-                        self._color_cache[ id( cond ) ] = cond.passes()
-                    ok = self._color_cache.get( id( cond ) )
+                    # Free when the remapper or pre-resolver already tested it this frame
+                    ok = cond.cached()
+                    if ok is None and refresh_colors:
+                        ok = cond.passes()
+                    if ok is None:
+                        ok = self._color_cache.get( id( cond ) )
+                    else:
+                        self._color_cache[ id( cond ) ] = ok
                     if ok is None:
                         glyphs += '?'
                         colors_ok = False
@@ -0,0 +1,96 @@
+"""
+pxl_watch.py watches the configuration files so edits apply to the running app without Ctrl+R.
+
+FileWatcher polls each file's ( mtime, size ) on a daemon thread - portable, dependency-free, and
+testable on any host, unlike a ReadDirectoryChangesW / inotify backend. A change is reported only
+once the file has stopped changing for `debounce` seconds and exists, so a burst of writes (or the
+editor's write-temp-then-replace save, during which the file briefly disappears) produces one
+callback. Callbacks run on the watcher thread and should only signal the main loop (e.g. set an
+Event); the poll loop applies the reload between ticks.
+"""
+
+import os
+import threading
+import time
+
+from ansi import *
+
+
+def _signature( path ):
+    """( mtime_ns, size ) of `path`, or None while it does not exist."""
+    try:
+        st = os.stat( path )
+    except OSError:
+        return None
+    return ( st.st_mtime_ns, st.st_size )
+
+
+class FileWatcher:
+    """
+    Polls a set of files on a daemon thread and calls each file's callback once per settled change
+    (debounced, and only while the file exists); see the module docstring.
+    """
+
+    def __init__( self, callbacks, interval = 0.25, debounce = 0.3 ):
+        """
+        Args:
+            callbacks (dict): path -> callable( path ), invoked once per settled change.
+            interval (float): seconds between polls.
+            debounce (float): seconds a changed file must stay unchanged before it is reported.
+        """
+        self.callbacks = dict( callbacks )
+        self.interval = interval
+        self.debounce = debounce
+
+        # path -> last reported signature, and path -> ( pending signature, first seen at )
+        self._reported = { path: _signature( path ) for path in self.callbacks }
+        self._pending = {}
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start( self ):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread( target = self._run, name = 'PxlWatch', daemon = True )
+        self._thread.start()
+
+    def stop( self ):
+        self._stop.set()
+        if self._thread:
+            self._thread.join( timeout = 1.0 )
+
+    def poll( self, now = None ):
+        """
+        One polling pass; returns the paths reported. Called by the watcher thread, or directly
+        (with a synthetic `now`) to drive the watcher deterministically.
+        """
+        now = time.perf_counter() if now is None else now
+        settled = []
+        for path in self.callbacks:
+            sig = _signature( path )
+            pending = self._pending.get( path )
+            if sig == self._reported[ path ] and pending is None:
+                continue
+            if pending is None or pending[ 0 ] != sig:
+                # New or still-changing content: (re)start the quiet period
+                self._pending[ path ] = ( sig, now )
+                continue
+            if now - pending[ 1 ] < self.debounce or sig is None:
+                continue
+            del self._pending[ path ]
+            if sig != self._reported[ path ]:
+                self._reported[ path ] = sig
+                settled.append( path )
+
+        for path in settled:
+            self.callbacks[ path ]( path )
+        return settled
+
+    def _run( self ):
+        while not self._stop.wait( self.interval ):
+            try:
+                self.poll()
+            except Exception as exc:
+                print( f"{RED}file watcher error: {exc}{RESET}" )
@@ -2,38 +2,144 @@
 PxlWinCheck is a single-purpose class designed to answer, on demand, whether the project should be
 acting: the correct application is in the foreground and every marker pixel is its expected color.
 
-This performs no background work and holds no cached flag; each call to check() reads the live
-window title and marker pixels so the result reflects the screen at the instant of the call (e.g. a
-key press or pixel reaction), avoiding stale-flag false triggers during state transitions such as
-loading screens.
+This performs no background work and holds no cached active flag; each call to check() reads the
+live foreground window handle and marker pixels so the result reflects the screen at the instant of
+the call (e.g. a key press or pixel reaction), avoiding stale-flag false triggers during state
+transitions such as loading screens.
+
+The foreground test goes through a FocusTracker. The Win32 tracker caches one ( hwnd, matched )
+pair: each call still reads the live foreground handle, but the window title is read and matched
+only when that handle differs from the cached one, so the steady-state cost is one
+GetForegroundWindow call and an integer compare. Changing the target title drops the cache. Off
+Windows a StaticFocusTracker stands in, so the module imports and runs headless.
+
+Optionally (app.wincheck_stateful) the poll loop also feeds each tick's live result to observe(),
+which maintains a debounced ACTIVE / INACTIVE state: a raw result must persist for the enter (or
+exit) debounce before the state flips, and each flip is returned as a transition event so the loop
+resets reaction streaks once per exit instead of on every inactive tick. The state word is
+published for the remapper, whose allowed() pairs it with a live focus and marker re-check
+against the current frame, so nothing fires into another window or on a screen the markers have
+not just passed.
 """
 
 import ctypes
+import sys
+import time
+from abc import ABC, abstractmethod
+
+from pxl_lib import ColorCondition, GateOrder
 
-from pxl_lib import ColorCondition
+# user32, loaded on first use so importing this module never requires Windows
+_user32 = None
 
-_user32 = ctypes.windll.user32
 
+def _get_user32():
+    global _user32
+    if _user32 is None:
+        from ctypes import wintypes
+        _user32 = ctypes.windll.user32
+        _user32.GetForegroundWindow.restype = wintypes.HWND
+    return _user32
 
-def _foreground_title():
+
+def _window_title( hwnd ):
     """
-    Title of the foreground window via ctypes (the only thing pywin32 was used for). The buffer is
-    per-call because check() runs concurrently on the poll and remapper threads.
+    Title of window `hwnd` via ctypes (the only thing pywin32 was used for). The buffer is per-call
+    because check() runs concurrently on the poll and remapper threads.
     """
     buf = ctypes.create_unicode_buffer( 256 )
-    _user32.GetWindowTextW( _user32.GetForegroundWindow(), buf, 256 )
+    _get_user32().GetWindowTextW( hwnd, buf, 256 )
     return buf.value
 
 
+class FocusTracker( ABC ):
+    """Answers whether the foreground window is the target app; see the module docstring."""
+
+    def __init__( self, target_title ):
+        self.target_title = target_title
+
+    def set_target( self, target_title ):
+        self.target_title = target_title
+
+    @abstractmethod
+    def matches( self ):
+        """True while the foreground window's title is the target title."""
+
+
+class Win32FocusTracker( FocusTracker ):
+    """Caches the title match per foreground window handle; reads the title only on a focus change."""
+
+    def __init__( self, target_title ):
+        super().__init__( target_title )
+        # ( hwnd, title matched ); replaced wholesale so concurrent readers never see it torn
+        self._seen = ( None, False )
+
+    def set_target( self, target_title ):
+        self.target_title = target_title
+        self._seen = ( None, False )
+
+    def matches( self ):
+        hwnd = _get_user32().GetForegroundWindow()
+        seen = self._seen
+        if hwnd == seen[ 0 ]:
+            return seen[ 1 ]
+        matched = _window_title( hwnd ) == self.target_title
+        self._seen = ( hwnd, matched )
+        return matched
+
+
+class StaticFocusTracker( FocusTracker ):
+    """
+    Headless stand-in: the "foreground title" is whatever was last given to set_foreground()
+    (default: the target, i.e. always focused), for replay benchmarks and tests off Windows.
+    """
+
+    def __init__( self, target_title, foreground = None ):
+        super().__init__( target_title )
+        self.foreground = target_title if foreground is None else foreground
+
+    def set_foreground( self, title ):
+        self.foreground = title
+
+    def matches( self ):
+        return self.foreground == self.target_title
+
+
+# Published gate states (PxlWinCheck.state)
+INACTIVE = 0
+ACTIVE = 1
+
+
+def make_focus_tracker( target_title ):
+    """The platform's FocusTracker: Win32 on Windows, the static stand-in elsewhere."""
+    if sys.platform == 'win32':
+        return Win32FocusTracker( target_title )
+    return StaticFocusTracker( target_title )
+
+
 class PxlWinCheck:
 
-    def __init__( self, config ):
+    def __init__( self, config, focus = None, stateful = False, enter_debounce = 0.0, exit_debounce = 0.0 ):
         """
         Args:
             config (dict): normalized `wincheck` profile section: `target_window` plus a `markers`
                 list of { x, y, color, tolerance }. Markers guard against inadvertent reactions, so
                 their tolerance defaults to 0 (exact match) at load time; all must pass (AND).
+            focus (FocusTracker | None): foreground-window test; default make_focus_tracker().
+            stateful (bool): maintain the debounced ACTIVE / INACTIVE state via observe().
+            enter_debounce, exit_debounce (float): seconds a live result must persist before the
+                state flips to ACTIVE / INACTIVE.
         """
+        self.focus = focus if focus is not None else make_focus_tracker( config[ 'target_window' ] )
+
+        self.stateful = stateful
+        self.enter_debounce = enter_debounce
+        self.exit_debounce = exit_debounce
+        # Written only by observe() on the poll thread; other threads just read the word
+        self.state = INACTIVE
+        self.transitions = 0
+        self._flip_since = None
+
         self.update( config )
 
     def update( self, config ):
@@ -42,19 +148,60 @@ class PxlWinCheck:
         loop survive a profile reload.
         """
         self.target_app = config[ 'target_window' ]
+        self.focus.set_target( self.target_app )
         self.markers = [
             ColorCondition( m[ 'x' ], m[ 'y' ], m[ 'color' ], m[ 'tolerance' ] )
             for m in config[ 'markers' ]
         ]
 
+        # check() = in_target_app AND marker_ok, evaluated in learned cheapest-first order; the
+        # learned statistics survive a reload (the gates are these same bound methods)
+        if getattr( self, 'gate', None ) is None:
+            self.gate = GateOrder( [ self.in_target_app, self.marker_ok ], names = [ 'title', 'markers' ] )
+
     def marker_ok( self ):
         return all( marker.passes() for marker in self.markers )
 
     def in_target_app( self ):
-        return self.target_app == _foreground_title()
+        return self.focus.matches()
 
     def check( self ):
-        return self.in_target_app() and self.marker_ok()
+        return self.gate()
+
+    def observe( self, now = None ):
+        """
+        Stateful gate step, called once per poll tick: evaluate check() live and advance the
+        debounced state. Returns ( active, event ): `active` is this tick's live check() AND the
+        ACTIVE state (a live pass still debouncing in, or a live fail still debouncing out, is not
+        active), and `event` is 'enter' / 'exit' when the state flipped on this call, else None.
+        """
+        live = self.check()
+        if live == ( self.state == ACTIVE ):
+            self._flip_since = None
+            return live, None
+
+        now = time.perf_counter() if now is None else now
+        if self._flip_since is None:
+            self._flip_since = now
+        if now - self._flip_since < ( self.enter_debounce if live else self.exit_debounce ):
+            return False, None
+
+        self.state = ACTIVE if live else INACTIVE
+        self._flip_since = None
+        self.transitions += 1
+        return live, ( 'enter' if live else 'exit' )
+
+    def allowed( self ):
+        """
+        Gate for the remapper's fire points (and the poll loop's deadline wakes). Stateless: the
+        full live check(). Stateful: the published state word plus a live focus and marker
+        re-check - the state lags the live result by the exit debounce, and nothing may be sent
+        to another focused window meanwhile. The focus test is a cached handle compare and the
+        markers are served from the frame the poll loop just grabbed.
+        """
+        if not self.stateful:
+            return self.check()
+        return self.state == ACTIVE and self.in_target_app() and self.marker_ok()
 
     def check_slow( self ):
         """
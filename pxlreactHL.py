@@ -5,21 +5,26 @@ lighter weight command line interface.
 This is the project's main module which is responsible for assigning reactions to pixels and then
 polling those pixels for changes.
 """
+import heapq
 import json
 import os
+import queue
 import time
 
 import threading
-
-from pxl_wincheck import PxlWinCheck
-from pxl_intercept import PxlIntercept
-from pxl_remap import PxlRemapper
+from concurrent.futures import ThreadPoolExecutor
 
 from pxl_lib import *
 from ansi import *
 
-from pxl_config import get_settings, load_profile, profile_points
+from pxl_config import get_settings, load_profile, profile_points, reload_settings
+from pxl_config import ConfigError, PROFILE_PATH, SETTINGS_PATH
 from pxl_status import StatusHub
+from pxl_sched import TickScheduler
+from pxl_metrics import METRICS
+from pxl_watch import FileWatcher
+from pxl_journal import Journal, read_journal, reaction_id
+from pxl_journal import FLAG_CAST_ACTIVE, FLAG_COLOR_READY, FLAG_CONFIRMED
 
 class PxlReactApp:
     """
@@ -32,12 +37,23 @@ class PxlReactApp:
         Load configuration (settings.toml + profile.json), wire up the subsystems, and create one
         monitored pixel per enabled profile reaction.
         """
+        # Interception and user32 bindings are Windows-only; importing them here (not at module
+        # level) keeps the reaction machinery below importable by headless benchmarks
+        from pxl_wincheck import PxlWinCheck
+        from pxl_intercept import PxlIntercept
+        from pxl_remap import PxlRemapper
+
         self.settings = get_settings()
         self.profile = load_profile()
 
-        # One mss grab per tick serves every configured pixel; register their bounding region
+        # A grab per region per tick serves every configured pixel; register their points
         PIXELS.max_age = self.settings[ 'app' ][ 'frame_max_age' ]
+        PIXELS.region_mode = self.settings[ 'app' ][ 'frame_regions' ]
+        PIXELS.cluster_distance = self.settings[ 'app' ][ 'cluster_distance' ]
+        PIXELS.set_backend( make_backend( self.settings[ 'app' ] ) )
         PIXELS.register_points( profile_points( self.profile ) )
+        if self.settings[ 'app' ][ 'frame_producer' ]:
+            PIXELS.start_producer()
 
         # Reporting funnel: publishers record runtime state here; the status bar (when enabled)
         # renders it. Gameplay events produce no terminal output.
@@ -45,14 +61,20 @@ class PxlReactApp:
         self.hub = StatusHub()
 
         # On-demand window/marker gate; check() is evaluated live at each reaction/remap fire point
-        self.wincheck = PxlWinCheck( self.profile[ 'wincheck' ] )
+        # (optionally behind a debounced ACTIVE / INACTIVE state, see pxl_wincheck)
+        app_cfg = self.settings[ 'app' ]
+        self.wincheck = PxlWinCheck( self.profile[ 'wincheck' ], stateful = app_cfg[ 'wincheck_stateful' ],
+                                     enter_debounce = app_cfg[ 'wincheck_enter_debounce' ],
+                                     exit_debounce = app_cfg[ 'wincheck_exit_debounce' ] )
 
         self.PI = PxlIntercept()
 
         self.stop_event = threading.Event()
 
-        # Set by the remapper's Ctrl+<reload_key> hotkey; consumed by the main loop between ticks
+        # Set by the remapper's Ctrl+<reload_key> hotkey (or the file watcher); consumed by the main
+        # loop between ticks, as is the settings reload request
         self._reload_event = threading.Event()
+        self._settings_event = threading.Event()
 
         # Shared cast lock: a cast-time reaction arms it so the remapper drops keypresses that would
         # otherwise interrupt the cast; remap actions with a cast_time arm the same lock.
@@ -67,18 +89,38 @@ class PxlReactApp:
                                      on_quit = self.exit_application, cast_lock = self.cast_lock,
                                      hub = self.hub, on_reload = self._reload_event.set )
 
-        self.tick_interval = self.settings[ 'app' ][ 'tick_interval' ]
+        # Deadline-based loop pacing (optionally adaptive); see pxl_sched
+        self.tick_interval = app_cfg[ 'tick_interval' ]
+        self.sched = TickScheduler( self.tick_interval, adaptive = app_cfg[ 'adaptive_tick' ],
+                                    fast_interval = app_cfg[ 'fast_tick_interval' ],
+                                    idle_interval = app_cfg[ 'idle_tick_interval' ],
+                                    idle_after = app_cfg[ 'idle_after' ], hot_hold = app_cfg[ 'hot_hold' ] )
 
         self.registry = PxlReactionRegistry( self )
 
+        # Optional reaction sharding: one pool for the app's lifetime, reused by reloaded tables
+        self.shards = app_cfg[ 'reaction_shards' ]
+        self.shard_pool = None
+        if self.shards > 1:
+            self.shard_pool = ThreadPoolExecutor( max_workers = self.shards, thread_name_prefix = 'PxlShard' )
+
         # One monitored pixel per enabled reaction; no fixed slot count
         self.pixels = []
         for name, data in self.profile[ 'reactions' ].items():
             if data[ 'enabled' ]:
                 self.load_reaction( name )
+        self.table = ReactionTable( self.pixels, self.shards, self.shard_pool )
         self.hub.set_reactions( [ name for name, data in self.profile[ 'reactions' ].items()
                                   if data[ 'enabled' ] ] )
 
+        # Optional file watching: edits to either config file request a reload between ticks
+        self.watcher = None
+        if app_cfg[ 'watch_files' ]:
+            self.watcher = FileWatcher( { PROFILE_PATH: lambda path: self._reload_event.set(),
+                                          SETTINGS_PATH: lambda path: self._settings_event.set() },
+                                        debounce = app_cfg[ 'watch_debounce' ] )
+            self.watcher.start()
+
         # Optional in-process status bar (DPG render loop on a daemon thread); fully absent when
         # disabled so headless runs carry no GUI dependency
         self.statusbar = None
@@ -93,28 +135,61 @@ class PxlReactApp:
 
     def start_update_loop( self ):
         """
-        Main update loop without GUI. Blocks and polls pixels at the configured interval.
+        Main update loop without GUI. Blocks and polls pixels at the scheduler's rate.
         """
+        self.frame_max_age = PIXELS.max_age
+        tick_hist = METRICS.histogram( 'tick_us' )
+        published = time.perf_counter()
+        was_active = False
+        self.sched.start()
         try:
             while not self.stop_event.is_set():
-                # Apply a pending profile reload between ticks, never mid-evaluation
+                started = time.perf_counter()
+
+                # Apply a pending settings / profile reload between ticks, never mid-evaluation
+                if self._settings_event.is_set():
+                    self._settings_event.clear()
+                    self._reload_settings()
                 if self._reload_event.is_set():
                     self._reload_event.clear()
                     self._reload_profile()
 
-                # One live gate read per tick; when inactive (wrong window or marker off, e.g. a
-                # loading screen) clear pending streaks so a confirmation can't carry across the
-                # gap and fire the instant the context returns.
-                active = self.wincheck.check()
+                # One live gate read per tick; when the context goes inactive (wrong window or
+                # marker off, e.g. a loading screen) clear pending streaks once so a confirmation
+                # can't carry across the gap and fire the instant the context returns. The stateful
+                # gate only resets on a debounced exit, and ticks only while ACTIVE and live.
+                if self.wincheck.stateful:
+                    active, event = self.wincheck.observe( started )
+                    drop = event == 'exit'
+                else:
+                    active = self.wincheck.check()
+                    drop = was_active and not active
+                was_active = active
                 self.hub.set_active( active )
-                for pxl in self.pixels:
-                    if active:
-                        pxl.update_color()
-                    elif pxl.reaction is not None:
-                        pxl.reaction.reset()
+                changed = False
+                if active:
+                    changed = self.table.tick()
+                elif drop:
+                    self.table.reset()
                 if self.registry.trigger_log is not None:
                     self.registry.trigger_log.maybe_save()
-                time.sleep( self.tick_interval )
+
+                period = self.sched.choose( active, self.table.pending(), changed )
+                if self.sched.adaptive:
+                    # A fast tick must see a fresh frame, not the previous tick's cached one
+                    PIXELS.max_age = min( self.frame_max_age, period / 2 )
+                now = time.perf_counter()
+                tick_hist.record( now - started )
+                if now - published >= 1.0:
+                    self.hub.set_tick_stats( self.sched.stats() )
+                    self.hub.set_metrics( METRICS.summary() )
+                    self.sched.reset_stats()
+                    published = now
+                # Sleep to the next tick, waking early for any reaction deadline that falls first
+                # (only while active: a streak held through an exit debounce must not fire). The
+                # gate is re-read live at each wake, as at every other fire point
+                while not self.sched.wait( self.table.next_deadline() if active else None ):
+                    self.table.service( self.wincheck.allowed )
         except KeyboardInterrupt:
             self.stop_event.set()
         finally:
@@ -138,33 +213,85 @@ class PxlReactApp:
 
     def _reload_profile( self ):
         """
-        Re-read profile.json and apply it to the running app: wincheck markers, reaction registry
-        and monitored pixels, and the remapper's bindings (cooldown state resets). On a validation
-        failure the current configuration keeps running and the error is reported.
+        Re-read profile.json and apply the difference to the running app. Only added, removed, or
+        edited reactions, actions, and rotations are rebuilt: an unchanged reaction keeps its
+        monitored pixel (readiness timers and any pending confirm streak), an unchanged action
+        keeps its cooldown, and capture regions are re-planned only when the point set moved. On a
+        validation failure the current configuration keeps running and the error is reported.
         """
         try:
             profile = load_profile()
             # Rebind first: it is the step most likely to raise beyond config validation (e.g. an
             # unknown source key name at scan-code lookup), and it swaps its tables atomically at
             # the end, so a failure here leaves the running configuration fully intact.
-            self.remapper.rebind( profile[ 'actions' ], profile[ 'rotations' ] )
+            actions_built, rotations_built = self.remapper.rebind( profile[ 'actions' ], profile[ 'rotations' ] )
         except Exception as exc:
             print( f"{RED}reload failed: {exc}{RESET}" )
             return
 
+        previous = self.profile
         self.profile = profile
         PIXELS.register_points( profile_points( profile ) )
-        self.wincheck.update( profile[ 'wincheck' ] )
-        self.registry.rebuild()
+        if profile[ 'wincheck' ] != previous[ 'wincheck' ]:
+            self.wincheck.update( profile[ 'wincheck' ] )
+        changed = self.registry.rebuild()
 
+        kept = { p.reaction.name: p for p in self.pixels if p.reaction.name not in changed }
+        old_pixels = self.pixels
         self.pixels = []
         for name, data in profile[ 'reactions' ].items():
-            if data[ 'enabled' ]:
+            if not data[ 'enabled' ]:
+                continue
+            pixel = kept.get( name )
+            if pixel is None:
                 self.load_reaction( name )
+            else:
+                pixel.index = len( self.pixels ) + 1
+                self.pixels.append( pixel )
+        if self.pixels != old_pixels:
+            self.table = ReactionTable( self.pixels, self.shards, self.shard_pool )
         self.hub.set_reactions( [ name for name, data in profile[ 'reactions' ].items()
                                   if data[ 'enabled' ] ] )
 
-        print( f"{GREEN}profile reloaded{RESET}" )
+        rebuilt = len( [ p for p in self.pixels if p.reaction.name in changed ] )
+        print( f"{GREEN}profile reloaded{RESET} ({MAGENTA}{rebuilt}{RESET} reactions, "
+               f"{MAGENTA}{actions_built}{RESET} actions, {MAGENTA}{rotations_built}{RESET} rotations rebuilt)" )
+
+    def _reload_settings( self ):
+        """
+        Re-read settings.toml and apply its live settings (pxl_config.LIVE_SETTINGS) to the
+        running subsystems; the interception contexts, frame backend, and worker threads are left
+        untouched, and any other changed key is reported as needing a restart. The profile is then
+        reloaded, because its normalization depends on color.default_tolerance; a profile change
+        flagged meanwhile is folded into that reload. When settings.toml is invalid nothing is
+        applied and a pending profile reload is left for the loop.
+        """
+        try:
+            settings, restart = reload_settings()
+        except ConfigError as exc:
+            print( f"{RED}settings reload failed: {exc}{RESET}" )
+            return
+
+        app_cfg = settings[ 'app' ]
+        self.frame_max_age = PIXELS.max_age = app_cfg[ 'frame_max_age' ]
+        self.tick_interval = self.sched.interval = app_cfg[ 'tick_interval' ]
+        self.sched.adaptive = app_cfg[ 'adaptive_tick' ]
+        self.sched.fast_interval = app_cfg[ 'fast_tick_interval' ]
+        self.sched.idle_interval = app_cfg[ 'idle_tick_interval' ]
+        self.sched.idle_after = app_cfg[ 'idle_after' ]
+        self.sched.hot_hold = app_cfg[ 'hot_hold' ]
+        self.wincheck.enter_debounce = app_cfg[ 'wincheck_enter_debounce' ]
+        self.wincheck.exit_debounce = app_cfg[ 'wincheck_exit_debounce' ]
+        self.PI.apply_settings()
+        self.remapper.apply_settings( settings[ 'remapper' ], app_cfg[ 'frame_max_age' ] )
+        if self.statusbar is not None:
+            self.statusbar.apply_settings( settings[ 'gui' ] )
+
+        print( f"{GREEN}settings reloaded{RESET}" )
+        if restart:
+            print( f"{YELLOW}restart to apply: {', '.join( restart )}{RESET}" )
+        self._reload_event.clear()
+        self._reload_profile()
 
     def exit_application( self ):
         """
@@ -179,13 +306,21 @@ class PxlReactApp:
         print( f"ℹ️ {RED}Exiting PxlReactApp...{RESET}" )
 
         # Persist and surface accumulated trigger data before tearing down so the user can spot
-        # ignorable colors; the forced save guarantees the final session's events reach disk.
+        # ignorable colors; close() compacts once more and stops the journal writer, so the final
+        # session's events reach disk.
         if self.registry.trigger_log is not None:
             try:
-                self.registry.trigger_log.save( force = True )
+                self.registry.trigger_log.close()
                 self.registry.trigger_log.report()
             except Exception:
                 pass
+        METRICS.report()
+        order = ' -> '.join( f"{name} ({cost:.1f} us, {fail:.0%} fail)"
+                             for name, cost, fail in self.wincheck.gate.ordering() )
+        print( f"{BLUE}wincheck order {RESET} {order}" )
+
+        if self.watcher is not None:
+            self.watcher.stop()
 
         # Capture debug mode (optional): drain/stop the snapshot worker if it was running
         if self.registry.snapshot is not None:
@@ -210,6 +345,11 @@ class PxlReactApp:
         except Exception:
             pass
 
+        if self.shard_pool is not None:
+            self.shard_pool.shutdown( wait = False )
+
+        PIXELS.stop_producer()
+
 
 class Pxl:
     """
@@ -286,6 +426,12 @@ class CooldownReadiness:
     def fired( self ):
         self._last = time.perf_counter()
 
+    def reopens_at( self ):
+        """perf_counter time the cooldown elapses, or None when already ready."""
+        if self._last < 0 or ( time.perf_counter() - self._last ) >= self.cooldown:
+            return None
+        return self._last + self.cooldown
+
 
 class ColorReadiness:
     """
@@ -304,35 +450,59 @@ class ColorReadiness:
         self.color = color
         self.tolerance = tolerance
         self.lockout = lockout
+        # Frame-memoized indicator test (shared verdict per frame, see ColorCondition)
+        self.condition = ColorCondition( px, py, color, tolerance )
         self._last = -1.0
 
     def ready( self ):
         if self._last >= 0 and ( time.perf_counter() - self._last ) < self.lockout:
             return False
-        observed = get_pixel_color( self.px, self.py )
-        return observed is not None and colors_similar( observed, self.color, self.tolerance )
+        return self.condition.passes()
 
     def fired( self ):
         self._last = time.perf_counter()
 
+    def reopens_at( self ):
+        """
+        perf_counter time the post-fire lockout ends, or None outside it. The indicator pixel has
+        no known reopen time; the regular poll notices it.
+        """
+        if self._last < 0 or ( time.perf_counter() - self._last ) >= self.lockout:
+            return None
+        return self._last + self.lockout
+
 
 class CompositeReadiness:
     """
     Readiness that requires ALL of its sub-strategies to be ready (logical AND). Use to combine, for
     example, a minimum cooldown with a pixel-color availability check, so a reaction fires only once
     the cooldown has elapsed AND the indicator shows the skill is available.
+
+    Sub-strategies are tried cheapest-and-most-selective first (GateOrder), so a cooldown that has
+    not elapsed rejects before any indicator pixel is read.
     """
 
     def __init__( self, strategies ):
         self.strategies = strategies
+        self.gate = GateOrder( [ s.ready for s in strategies ],
+                               names = [ type( s ).__name__ for s in strategies ] )
 
     def ready( self ):
-        return all( s.ready() for s in self.strategies )
+        return self.gate()
 
     def fired( self ):
         for s in self.strategies:
             s.fired()
 
+    def reopens_at( self ):
+        """Latest timed reopen among the sub-strategies (all must be ready), or None."""
+        times = [ t for t in ( s.reopens_at() for s in self.strategies ) if t is not None ]
+        return max( times ) if times else None
+
+
+# Condition onset (first firing reading) to reaction key submitted, confirm window included
+_ONSET_FIRE_HIST = METRICS.histogram( 'onset_fire_us' )
+
 
 class PxlReaction:
     """
@@ -388,6 +558,24 @@ class PxlReaction:
         self.cast_time = cast_time
         self.cast_lock = cast_lock
 
+        # Trigger-log context known at build time; whether another cast is in flight is added per fire
+        strategies = getattr( readiness, 'strategies', [ readiness ] )
+        self.log_flags = ( ( FLAG_CONFIRMED if confirm > 0 else 0 )
+                           | ( FLAG_COLOR_READY if any( isinstance( s, ColorReadiness ) for s in strategies ) else 0 ) )
+
+        # Compiled color test: react_if_color fires on MATCH; react_if_not_color fires on DIFFERENT
+        # (a reading within tolerance of an ignore color classifies as IGNORED and does not fire)
+        if reaction_type == "react_if_color":
+            self.classifier = color_classifier( reaction_color, tolerance )
+            self.fire_verdict = MATCH
+        else:
+            self.classifier = color_classifier( reaction_color, tolerance, self.ignore_colors )
+            self.fire_verdict = DIFFERENT
+
+        # Last color classified and its verdict: an unchanged reading reuses the verdict
+        self._last_rgb = None
+        self._last_firing = False
+
         # perf_counter timestamp marking the start of an uninterrupted firing-condition streak; None
         # while the pixel reads as safe. A trigger requires the streak to last at least `confirm`.
         self._pending_since = None
@@ -401,11 +589,10 @@ class PxlReaction:
         react_if_color: the pixel matches `reaction_color`.
         """
         rgb = self.pxl.rgb
-        if self.type == "react_if_color":
-            return colors_similar( rgb, self.reaction_color, self.tolerance )
-        # default: react_if_not_color
-        return ( colors_different( rgb, self.reaction_color, self.tolerance )
-                 and not matches_any( rgb, self.ignore_colors, self.tolerance ) )
+        if rgb != self._last_rgb:
+            self._last_rgb = rgb
+            self._last_firing = self.classifier.classify( rgb ) == self.fire_verdict
+        return self._last_firing
 
     def evaluate( self ):
         """
@@ -416,29 +603,64 @@ class PxlReaction:
         The caller (poll loop) must only invoke this while the app context is active; reset() drops
         a pending streak when the context goes inactive.
         """
-        if not self._should_fire():
+        self.advance( self._should_fire(), time.perf_counter() )
+
+    def advance( self, firing, now ):
+        """
+        The debounce/readiness state machine, given an already-computed firing condition. Shared
+        by evaluate() and the ReactionTable, which computes `firing` for every reaction in one pass.
+        """
+        if self.decide( firing, now ):
+            self.fire()
+
+    def decide( self, firing, now ):
+        """
+        The decision half of advance(): update the confirm streak and return True when the reaction
+        should fire now. Has no effect outside this reaction, so the ReactionTable can run it for
+        disjoint reactions on shard threads and fire() the winners afterwards in table order.
+        """
+        if not firing:
             self._pending_since = None
-            return
+            return False
 
-        now = time.perf_counter()
         if self._pending_since is None:
             self._pending_since = now
 
-        if self.readiness.ready() and ( now - self._pending_since ) >= self.confirm:
-            self.trigger()
-            self._pending_since = None
+        return self.readiness.ready() and ( now - self._pending_since ) >= self.confirm
+
+    def fire( self ):
+        """The effect half of advance(): trigger and close the streak."""
+        self.trigger()
+        _ONSET_FIRE_HIST.record( time.perf_counter() - self._pending_since )
+        self._pending_since = None
 
     def reset( self ):
         """Drop any in-progress confirmation streak (called when the app context is inactive)."""
         self._pending_since = None
 
+    def wake_at( self ):
+        """
+        perf_counter time a pending streak could next fire: the later of its confirm deadline and
+        the readiness strategy's timed reopen. None when no streak is pending.
+        """
+        if self._pending_since is None:
+            return None
+        due = self._pending_since + self.confirm
+        reopen = self.readiness.reopens_at()
+        return due if reopen is None else max( due, reopen )
+
     def trigger( self ):
         """
         Call the reaction function and notify the readiness strategy that it fired. The triggering
-        pixel color is recorded to the trigger log (when one is attached) before firing.
+        pixel color, the condition streak, and the context flags are recorded to the trigger log
+        (when one is attached) before firing.
         """
         if self.trigger_log is not None:
-            self.trigger_log.record( self.name, self.pxl.rgb )
+            flags = self.log_flags
+            if self.cast_lock is not None and self.cast_lock.active():
+                flags |= FLAG_CAST_ACTIVE
+            streak = 0.0 if self._pending_since is None else time.perf_counter() - self._pending_since
+            self.trigger_log.record( self.name, self.pxl.rgb, streak, flags )
         # Arm the cast lock before sending the key so an in-flight remap press can't slip in and
         # interrupt the cast between firing and the lock being set.
         if self.cast_time > 0 and self.cast_lock is not None:
@@ -447,6 +669,207 @@ class PxlReaction:
         self.readiness.fired()
 
 
+class ReactionTable:
+    """
+    Compiled per-tick evaluator for every monitored pixel.
+
+    At (re)load each reaction's coordinates and compiled color test (its ColorClassifier, which
+    folds the target color, tolerance, and ignore palette into one lookup table) are packed into
+    flat rows. Each tick then gathers all monitored pixels in one PixelSource.get_many call (one
+    frame per capture region) and classifies every reading in a single tight loop. Only reactions
+    whose condition holds - or that have a confirm streak to cancel - enter the Python
+    debounce/readiness state machine (PxlReaction.advance), so steady safe pixels cost one table
+    lookup each.
+
+    Change detection: a reading equal to the reaction's previous one reuses its cached verdict
+    without classifying, and when the whole sampled vector equals the previous tick's (nothing on
+    screen moved - the common case in steady play) the tick skips classification entirely and only
+    advances the reactions whose condition currently holds, so debounce timing and readiness gating
+    still progress exactly as if every pixel had been re-evaluated. Comparison is exact (not a
+    hash), so a collision can never mask a change.
+
+    Deadline wakeups: a pending streak can only fire once its confirm window elapses and its
+    readiness reopens, both known times. The table keeps a min-heap of those future times; the poll
+    loop sleeps until the earliest (or the next tick, whichever comes first) and service() re-samples
+    just the due reactions' pixels, so a debounced firing is not delayed by up to a whole tick.
+
+    Sharding (app.reaction_shards > 1, with a thread `pool`): a tick's classify + decide work is
+    split into contiguous index ranges evaluated concurrently against the same sampled vector.
+    Decisions (PxlReaction.decide) touch only their own reaction; the reactions that decided to
+    fire are then fired on the calling thread in table order, exactly the order the serial pass
+    fires them, so trigger-log entries and CastLock arming order are unchanged. Only blocking work
+    (readiness pixel reads that miss the frame cache) overlaps; pure-Python classification still
+    shares the GIL, so sharding pays off only for large profiles with I/O-bound readiness.
+    """
+
+    def __init__( self, pixels, shards = 1, pool = None ):
+        self.pixels = [ p for p in pixels if p.reaction is not None ]
+        self.points = [ ( p.sx, p.sy ) for p in self.pixels ]
+        self.reactions = [ p.reaction for p in self.pixels ]
+
+        # One row per reaction: ( classify, verdict_that_fires )
+        self.rows = [ ( r.classifier.classify, r.fire_verdict ) for r in self.reactions ]
+
+        # Previous tick's sampled vector, per-reaction cached verdicts, and the indices whose
+        # condition held on the last evaluated reading
+        self._last_colors = [ None ] * len( self.pixels )
+        self._firing = [ False ] * len( self.pixels )
+        self._hot = []
+
+        # Min-heap of ( due, index ) wake deadlines; _scheduled holds each index's live entry so
+        # superseded heap entries are discarded lazily
+        self._deadlines = []
+        self._scheduled = {}
+
+        # Contiguous index ranges, one per shard; no pool (or one shard) = evaluate inline
+        count = len( self.pixels )
+        shards = max( 1, min( shards, count ) )
+        step = -( -count // shards ) if count else 1
+        self._ranges = [ range( lo, min( lo + step, count ) ) for lo in range( 0, count, step ) ]
+        self._pool = pool if len( self._ranges ) > 1 else None
+
+    def _run_shards( self, work, parts, *args ):
+        """work( part, *args ) for each part, on the pool when sharded; results in part order."""
+        if self._pool is None or len( parts ) < 2:
+            return [ work( part, *args ) for part in parts ]
+        futures = [ self._pool.submit( work, part, *args ) for part in parts ]
+        return [ future.result() for future in futures ]
+
+    def _decide_range( self, indices, colors, now ):
+        """
+        Classify and decide reactions `indices` against the sampled `colors` (one shard's work).
+        Returns ( hot, decided ): the indices whose condition holds, and ( index, fires ) for every
+        reaction that entered the state machine.
+        """
+        firing_cache = self._firing
+        last_colors = self._last_colors
+        hot = []
+        decided = []
+        for i in indices:
+            rgb = colors[ i ]
+            if rgb is None:
+                continue
+            if rgb != last_colors[ i ]:
+                self.pixels[ i ].rgb = rgb
+                classify, fire_verdict = self.rows[ i ]
+                firing = firing_cache[ i ] = classify( rgb ) == fire_verdict
+            else:
+                firing = firing_cache[ i ]
+            if firing:
+                hot.append( i )
+            reaction = self.reactions[ i ]
+            if firing or reaction._pending_since is not None:
+                decided.append( ( i, reaction.decide( firing, now ) ) )
+        return hot, decided
+
+    def _decide_hot( self, indices, now ):
+        """Decide the still-firing reactions `indices` on an unchanged frame (one shard's work)."""
+        return [ ( i, self.reactions[ i ].decide( True, now ) ) for i in indices ]
+
+    def _merge( self, decided, now ):
+        """Fire the reactions that decided to, in table order, and reschedule every decided one."""
+        reactions = self.reactions
+        for i, fires in decided:
+            if fires:
+                reactions[ i ].fire()
+            self._schedule( i, now )
+
+    def _schedule( self, i, now ):
+        """(Re)schedule reaction `i`'s wake deadline after it advanced at `now`."""
+        due = self.reactions[ i ].wake_at()
+        if due is None or due <= now:
+            # Nothing pending, or already due and blocked on an untimed gate the poll re-checks
+            self._scheduled.pop( i, None )
+        elif self._scheduled.get( i ) != due:
+            self._scheduled[ i ] = due
+            heapq.heappush( self._deadlines, ( due, i ) )
+
+    def next_deadline( self ):
+        """Earliest live wake deadline (perf_counter time), or None."""
+        heap = self._deadlines
+        while heap and self._scheduled.get( heap[ 0 ][ 1 ] ) != heap[ 0 ][ 0 ]:
+            heapq.heappop( heap )
+        return heap[ 0 ][ 0 ] if heap else None
+
+    def service( self, gate = None ):
+        """
+        Re-sample and advance only the reactions whose wake deadline has arrived. `gate` (the live
+        wincheck) is checked before anything can fire, since the tick's gate read may be a full
+        period old; when it fails the due wakes are dropped unfired and the next tick decides.
+        """
+        now = time.perf_counter()
+        heap = self._deadlines
+        if gate is not None and heap and heap[ 0 ][ 0 ] <= now and not gate():
+            while heap and heap[ 0 ][ 0 ] <= now:
+                due, i = heapq.heappop( heap )
+                if self._scheduled.get( i ) == due:
+                    del self._scheduled[ i ]
+            return
+        while heap and heap[ 0 ][ 0 ] <= now:
+            due, i = heapq.heappop( heap )
+            if self._scheduled.get( i ) != due:
+                continue
+            del self._scheduled[ i ]
+
+            pixel, reaction = self.pixels[ i ], self.reactions[ i ]
+            rgb = PIXELS.get( pixel.sx, pixel.sy )
+            if rgb is None:
+                continue
+            if rgb != self._last_colors[ i ]:
+                pixel.rgb = rgb
+                classify, fire_verdict = self.rows[ i ]
+                firing = self._firing[ i ] = classify( rgb ) == fire_verdict
+                # Keep the tick's change detection and hot list consistent with this reading
+                self._last_colors[ i ] = rgb
+                if firing and i not in self._hot:
+                    self._hot.append( i )
+                elif not firing and i in self._hot:
+                    self._hot.remove( i )
+            else:
+                firing = self._firing[ i ]
+            reaction.advance( firing, now )
+            self._schedule( i, now )
+
+    def tick( self ):
+        """
+        Sample every monitored pixel and advance the reactions that need it. Returns True when any
+        sampled pixel changed since the previous tick (the scheduler's activity signal).
+        """
+        colors = PIXELS.get_many( self.points )
+        now = time.perf_counter()
+
+        if colors == self._last_colors:
+            # Frame-level short circuit: every verdict stands; only live streaks need the clock
+            hot = self._hot
+            parts = [ hot ]
+            if self._pool is not None and len( hot ) > 1:
+                step = -( -len( hot ) // len( self._ranges ) )
+                parts = [ hot[ lo:lo + step ] for lo in range( 0, len( hot ), step ) ]
+            for decided in self._run_shards( self._decide_hot, parts, now ):
+                self._merge( decided, now )
+            return False
+
+        hot = []
+        for part_hot, decided in self._run_shards( self._decide_range, self._ranges, colors, now ):
+            hot += part_hot
+            self._merge( decided, now )
+
+        self._last_colors = colors
+        self._hot = hot
+        return True
+
+    def pending( self ):
+        """True while any reaction has a confirm streak running."""
+        return any( r._pending_since is not None for r in self.reactions )
+
+    def reset( self ):
+        """Drop every pending confirm streak (the app context went inactive)."""
+        for reaction in self.reactions:
+            reaction.reset()
+        self._deadlines.clear()
+        self._scheduled.clear()
+
+
 def _build_one_readiness( spec ):
     """Build a single readiness strategy from one normalized `ready` spec dict."""
     if spec[ 'type' ] == 'color':
@@ -494,6 +917,16 @@ def build_reaction( pixel, data, name, trigger_log, cast_lock ):
     )
 
 
+class _Flush:
+    """TriggerLog writer request: compact the journal into the snapshot (and optionally stop)."""
+
+    __slots__ = ( 'done', 'stop' )
+
+    def __init__( self, stop = False ):
+        self.done = threading.Event()
+        self.stop = stop
+
+
 class TriggerLog:
     """
     Optional instrumentation that records the pixel color responsible for each reaction firing.
@@ -505,12 +938,19 @@ class TriggerLog:
     genuine emergencies, their collapsed counts dominate the report - making them obvious candidates
     for a reaction's `ignore_colors`.
 
-    When a `path` is configured the counts persist to a JSON file: prior data is loaded and merged
-    at construction, the file is rewritten periodically during play (via `maybe_save`) and on exit,
-    so the tally accumulates across sessions and the report is meaningful regardless of when it is
-    consulted. The on-disk shape is { reaction_name: { "r,g,b": count } }.
+    When a `path` is configured every firing is also appended to a binary journal next to it
+    (`<path>.journal`, see pxl_journal): timestamp, reaction, RGB, condition streak, and context
+    flags. A background writer thread owns all disk I/O - `record` only queues the event - and
+    periodically (via `maybe_save`) and on exit compacts the journal into the JSON snapshot at
+    `path`, which stores the counts plus the journal offset they cover. Loading merges the snapshot
+    with the journal tail past that offset, so the tally accumulates across sessions while the
+    journal keeps the per-event history. The snapshot's counts have the shape
+    { reaction_name: { "r,g,b": count } }; older count-only snapshots still load.
     """
 
+    SNAPSHOT_FORMAT = 2
+    JOURNAL_SUFFIX = ".journal"
+
     def __init__( self, collapse_tolerance, verbose = False, path = None,
                   save_interval = 60.0 ):
         """
@@ -519,96 +959,213 @@ class TriggerLog:
                 (typically the settings default color tolerance).
             verbose (bool): When True, echo a compact swatch line on every recorded trigger. Off by
                 default to avoid scrolling the terminal during play.
-            path (str | None): JSON file for persistence. None disables all disk I/O (in-memory only).
-            save_interval (float): Minimum seconds between periodic `maybe_save` writes.
+            path (str | None): JSON snapshot path; the journal sits beside it. None disables all disk
+                I/O (in-memory only).
+            save_interval (float): Minimum seconds between periodic `maybe_save` compactions.
         """
         self.collapse_tolerance = collapse_tolerance
         self.verbose = verbose
         self.path = path
+        self.journal_path = f"{path}{self.JOURNAL_SUFFIX}" if path else None
         self.save_interval = save_interval
 
         # reaction_name -> { rgb_tuple: count }
         self._counts = {}
 
-        # Recording happens on the poll thread while periodic/exit saves may read concurrently; a
-        # lock keeps the dict consistent during serialization.
+        # Recording happens on the poll thread while the exit report may read concurrently; a lock
+        # keeps the dict consistent.
         self._lock = threading.Lock()
         self._dirty = False
         self._last_save = time.perf_counter()
 
+        # Writer-thread state: the counts already on disk (snapshot + journaled firings), which is
+        # what a compaction writes, and the journal append handle
+        self._persisted = {}
+        self._journal = None
+        self._queue = queue.SimpleQueue()
+        self._writer = None
+
         if self.path:
             self.load()
+        # load() clears `path` when the journal cannot be opened
+        if self.path:
+            self._writer = threading.Thread( target = self._write_loop, name = 'PxlTriggerLog', daemon = True )
+            self._writer.start()
 
-    def record( self, reaction_name, rgb ):
-        """Tally one trigger of `reaction_name` caused by color `rgb`."""
+    def record( self, reaction_name, rgb, streak = 0.0, flags = 0 ):
+        """
+        Tally one trigger of `reaction_name` caused by color `rgb` and queue it for the journal.
+        `streak` is the seconds the firing condition held before the fire; `flags` are pxl_journal
+        FLAG_* context bits.
+        """
         if rgb is None:
             return
         with self._lock:
             bucket = self._counts.setdefault( reaction_name, {} )
             bucket[ rgb ] = bucket.get( rgb, 0 ) + 1
             self._dirty = True
+        if self._writer is not None:
+            self._queue.put( ( time.time(), reaction_name, streak, rgb, flags ) )
 
         if self.verbose:
             print( f"  {describe_color( rgb )} -> {BLUE}{reaction_name}{RESET}" )
 
     def load( self ):
         """
-        Merge counts from the JSON file into memory. Missing files are ignored; a corrupt or
-        unreadable file is reported and skipped (the session starts a fresh tally rather than
-        crashing). Color keys are stored as "r,g,b" strings and parsed back to int tuples.
+        Merge the snapshot and the journal tail it does not cover into memory, and open the journal
+        for appending. Missing files are ignored; a corrupt or unreadable snapshot is reported and
+        skipped (the session starts a fresh tally rather than crashing). A journal that cannot be
+        opened disables persistence for the session.
         """
-        if not self.path or not os.path.exists( self.path ):
-            return
+        counts, created, offset = self._read_snapshot()
+
+        journal, events, names, end = read_journal( self.journal_path, offset )
+        if journal is not None and journal != created and offset:
+            # The snapshot covers a different (replaced) journal: every record here is new
+            journal, events, names, end = read_journal( self.journal_path )
+
+        lookup = { reaction_id( name ): name for name in counts }
+        lookup.update( names )
+        for _, rid, _, rgb, _ in events:
+            bucket = counts.setdefault( lookup.get( rid, f"#{rid:08x}" ), {} )
+            bucket[ rgb ] = bucket.get( rgb, 0 ) + 1
+
         try:
-            with open( self.path, "r", encoding = "utf-8" ) as fh:
-                data = json.load( fh )
-        except ( OSError, ValueError ) as exc:
-            print( f"{YELLOW}Trigger log: could not read {CYAN}{self.path}{RESET} ({exc}); starting fresh.{RESET}" )
-            return
+            self._journal = Journal( self.journal_path, journal, end, names )
+        except OSError as exc:
+            print( f"{YELLOW}Trigger log: could not open {CYAN}{self.journal_path}{RESET} ({exc}); "
+                   f"not persisting this session.{RESET}" )
+            self.path = None
 
+        self._persisted = counts
         with self._lock:
-            for name, colors in data.items():
+            for name, colors in counts.items():
                 bucket = self._counts.setdefault( name, {} )
-                for key, count in colors.items():
-                    try:
-                        rgb = tuple( int( part ) for part in key.split( "," ) )
-                    except ValueError:
-                        continue
-                    if len( rgb ) == 3:
-                        bucket[ rgb ] = bucket.get( rgb, 0 ) + int( count )
+                for rgb, count in colors.items():
+                    bucket[ rgb ] = bucket.get( rgb, 0 ) + count
 
-    def save( self, force = False ):
+    def _read_snapshot( self ):
         """
-        Write the current counts to the JSON file. No-op when persistence is disabled or (unless
-        `force`) nothing has changed since the last write. The write is atomic (temp file + replace)
-        so a crash mid-write cannot corrupt long-lived data.
+        ( counts, journal_created, journal_offset ) from the JSON snapshot. Count-only snapshots
+        from before the journal carry no journal position. Color keys are stored as "r,g,b" strings
+        and parsed back to int tuples.
         """
-        if not self.path:
+        if not os.path.exists( self.path ):
+            return {}, None, 0
+        try:
+            with open( self.path, "r", encoding = "utf-8" ) as fh:
+                data = json.load( fh )
+        except ( OSError, ValueError ) as exc:
+            print( f"{YELLOW}Trigger log: could not read {CYAN}{self.path}{RESET} ({exc}); starting fresh.{RESET}" )
+            return {}, None, 0
+
+        created, offset = None, 0
+        if data.get( "format" ) == self.SNAPSHOT_FORMAT:
+            journal = data.get( "journal" ) or {}
+            created, offset = journal.get( "created" ), journal.get( "offset", 0 )
+            data = data.get( "reactions", {} )
+
+        counts = {}
+        for name, colors in data.items():
+            bucket = counts.setdefault( name, {} )
+            for key, count in colors.items():
+                try:
+                    rgb = tuple( int( part ) for part in key.split( "," ) )
+                except ValueError:
+                    continue
+                if len( rgb ) == 3:
+                    bucket[ rgb ] = bucket.get( rgb, 0 ) + int( count )
+        return counts, created, offset
+
+    def save( self, force = False, timeout = 5.0 ):
+        """
+        Compact the journal into the snapshot and wait (up to `timeout` seconds) for the writer to
+        finish. No-op when persistence is disabled or (unless `force`) nothing was recorded since
+        the last compaction.
+        """
+        if self._writer is None:
             return
         with self._lock:
             if not force and not self._dirty:
                 return
-            payload = {
-                name: { f"{r},{g},{b}": count for ( r, g, b ), count in colors.items() }
-                for name, colors in self._counts.items()
-            }
             self._dirty = False
             self._last_save = time.perf_counter()
-
-        tmp = f"{self.path}.tmp"
-        try:
-            with open( tmp, "w", encoding = "utf-8" ) as fh:
-                json.dump( payload, fh, indent = 2 )
-            os.replace( tmp, self.path )
-        except OSError as exc:
-            print( f"{YELLOW}Trigger log: failed to write {CYAN}{self.path}{RESET} ({exc}).{RESET}" )
+        request = _Flush()
+        self._queue.put( request )
+        request.done.wait( timeout )
 
     def maybe_save( self ):
-        """Save if at least `save_interval` seconds have elapsed since the last write. Cheap to poll."""
-        if not self.path:
+        """
+        Request a compaction if at least `save_interval` seconds have elapsed since the last one.
+        Cheap to poll and never waits on disk: the writer thread does the work.
+        """
+        if self._writer is None or ( time.perf_counter() - self._last_save ) < self.save_interval:
             return
-        if ( time.perf_counter() - self._last_save ) >= self.save_interval:
-            self.save()
+        with self._lock:
+            self._last_save = time.perf_counter()
+            if not self._dirty:
+                return
+            self._dirty = False
+        self._queue.put( _Flush() )
+
+    def close( self, timeout = 5.0 ):
+        """Compact a final time and stop the writer thread. Safe to call more than once."""
+        if self._writer is None:
+            return
+        request = _Flush( stop = True )
+        self._queue.put( request )
+        request.done.wait( timeout )
+        self._writer.join( timeout )
+        self._writer = None
+
+    def _write_loop( self ):
+        """Writer thread: append queued firings in batches and run requested compactions."""
+        while True:
+            batch = [ self._queue.get() ]
+            try:
+                while True:
+                    batch.append( self._queue.get_nowait() )
+            except queue.Empty:
+                pass
+
+            events = [ item for item in batch if not isinstance( item, _Flush ) ]
+            flushes = [ item for item in batch if isinstance( item, _Flush ) ]
+            try:
+                if events:
+                    self._journal.append( events )
+                    for _, name, _, rgb, _ in events:
+                        bucket = self._persisted.setdefault( name, {} )
+                        bucket[ rgb ] = bucket.get( rgb, 0 ) + 1
+                if flushes:
+                    self._compact()
+            except OSError as exc:
+                print( f"{YELLOW}Trigger log: failed to write {CYAN}{self.path}{RESET} ({exc}).{RESET}" )
+
+            for request in flushes:
+                request.done.set()
+            if any( request.stop for request in flushes ):
+                self._journal.close()
+                return
+
+    def _compact( self ):
+        """
+        Write the persisted counts and the journal position they cover to the snapshot. The journal
+        is synced first and the snapshot replaced atomically (temp file + replace), so a crash at
+        any point leaves a snapshot/journal pair that loads without losing or double counting.
+        """
+        self._journal.sync()
+        payload = {
+            "format": self.SNAPSHOT_FORMAT,
+            "journal": { "created": self._journal.created, "offset": self._journal.offset },
+            "reactions": {
+                name: { f"{r},{g},{b}": count for ( r, g, b ), count in colors.items() }
+                for name, colors in self._persisted.items()
+            },
+        }
+        tmp = f"{self.path}.tmp"
+        with open( tmp, "w", encoding = "utf-8" ) as fh:
+            json.dump( payload, fh, indent = 2 )
+        os.replace( tmp, self.path )
 
     def _collapse( self, bucket ):
         """
@@ -690,12 +1247,24 @@ class PxlReactionRegistry:
         self.rebuild()
 
     def rebuild( self ):
-        """(Re)build registry entries from the app's current profile; fire timing resets."""
+        """
+        (Re)build registry entries from the app's current profile. A reaction whose profile data
+        is unchanged since the last build keeps its entry and fire timing; returns the names of the
+        entries that were (re)built.
+        """
+        built_from = getattr( self, '_built_from', {} )
+        reactions = self.app.profile[ 'reactions' ]
+        changed = { name for name, data in reactions.items() if built_from.get( name ) != data }
+        old_registry = getattr( self, 'reactions_registry', {} )
+        old_ticks = getattr( self, 'last_reaction_ticks', {} )
         self.reactions_registry = {
-            name: self._build_entry( name, data )
-            for name, data in self.app.profile[ 'reactions' ].items()
+            name: self._build_entry( name, data ) if name in changed else old_registry[ name ]
+            for name, data in reactions.items()
         }
-        self.last_reaction_ticks = { name: None for name in self.reactions_registry }
+        self.last_reaction_ticks = { name: None if name in changed else old_ticks.get( name )
+                                     for name in self.reactions_registry }
+        self._built_from = dict( reactions )
+        return changed
 
     def _build_entry( self, name, data ):
         """Translate a normalized profile reaction into a runtime registry entry."""
@@ -714,9 +1283,14 @@ class PxlReactionRegistry:
         }
 
     def _make_reaction( self, name, press ):
-        """Synthesize the reaction callable: send the configured key and log the firing."""
+        """
+        Synthesize the reaction callable: send the configured key and log the firing. The key's
+        strokes are compiled here, at load, so a firing does no key lookup or stroke packing.
+        """
+        strokes = self.app.PI.compile( press )
+
         def _react():
-            self.app.PI.press( press )
+            self.app.PI.press( strokes )
             self._log_reaction( name )
         return _react
 